@@ -1,3 +1,4 @@
 from app.api.tickets import router as tickets_router
+from app.api.users import router as users_router
 
-__all__ = ["tickets_router"]
\ No newline at end of file
+__all__ = ["tickets_router", "users_router"]
\ No newline at end of file
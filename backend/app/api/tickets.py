@@ -1,33 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from app import crud, schemas
-from app.database import get_db
+from app.cache import CachedResponse, read_cache
+from app.database import DatabaseSession, get_db
 from app.enums import TicketStatus, TicketType, TicketPriority
+from app.export import MEDIA_TYPES, stream_export
+from app.http_cache import make_etag, cache_headers, is_not_modified, not_modified
+from app.pagination import InvalidCursorError, decode_cursor, next_cursor
+from app.responses import negotiated_response, representation_etag
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
+# Upper bound on items per bulk request (one transaction each)
+BULK_MAX_ITEMS = 500
+
+# Validates and dumps a whole page in one call instead of one model per ticket
+TICKET_LIST = TypeAdapter(List[schemas.TicketOut])
+
+# Columns a list request may project with `fields=`
+TICKET_FIELDS = tuple(schemas.TicketOut.model_fields)
+SUMMARY_FIELDS = tuple(schemas.TicketSummary.model_fields)
+
+def _parse_fields(fields: str) -> Tuple[str, ...]:
+    """Validate a `fields=` value: "summary" or comma-separated TicketOut fields"""
+    if fields == "summary":
+        return SUMMARY_FIELDS
+    names = tuple(name.strip() for name in fields.split(",") if name.strip())
+    unknown = [name for name in names if name not in TICKET_FIELDS]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or fields!r}; allowed: {', '.join(TICKET_FIELDS)}"
+        )
+    return names
+
+def _ticket_etag(ticket_id: int, updated_at: Optional[datetime]) -> str:
+    return make_etag("ticket", ticket_id, updated_at)
+
+def _revalidate(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """304 if the client already has this version in the format it asks for, else None"""
+    etag = representation_etag(request, etag)
+    return not_modified(etag) if is_not_modified(request, etag) else None
+
+def _respond(request: Request, entry: CachedResponse) -> Response:
+    """304 if the client already has this version, else the body as JSON or msgpack"""
+    response = _revalidate(request, entry.etag)
+    if response is not None:
+        return response
+    return negotiated_response(request, entry.body, entry.headers)
+
+def _check_bulk_size(items: list) -> None:
+    if not items:
+        raise HTTPException(status_code=422, detail="Bulk request is empty")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Bulk request exceeds {BULK_MAX_ITEMS} items"
+        )
+
 @router.post("/", response_model=schemas.TicketOut, summary="Create a ticket")
-def create_ticket(
+async def create_ticket(
     ticket: schemas.TicketCreate,
-    db: Session = Depends(get_db)
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Client-generated key; a repeated request returns the original ticket"
+    ),
+    db: DatabaseSession = Depends(get_db)
 ):
-    """Create a new ticket from user"""
-    return crud.create_ticket(db, ticket)
+    """Create a new ticket from user
+
+    With an `Idempotency-Key` header, retries of the same request (lost
+    response, double tap) return the ticket created the first time, marked
+    with `Idempotent-Replayed: true`, instead of creating a duplicate.
+    """
+    if not idempotency_key:
+        created = await db.run(crud.create_ticket, ticket)
+        await read_cache.invalidate()
+        return created
+    
+    try:
+        created, replayed = await db.run(crud.create_ticket_once, ticket, idempotency_key)
+    except crud.IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    if replayed:
+        if created is None:
+            raise HTTPException(status_code=404, detail="Ticket created with this Idempotency-Key was deleted")
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        await read_cache.invalidate()
+    return created
 
 @router.get("/", response_model=List[schemas.TicketOut], summary="Get tickets list")
-def read_tickets(
+async def read_tickets(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Number of records per page"),
     status: Optional[TicketStatus] = Query(None, description="Filter by status"),
     type: Optional[TicketType] = Query(None, description="Filter by type"),
     priority: Optional[TicketPriority] = Query(None, description="Filter by priority"),
-    search: Optional[str] = Query(None, description="Search in text, name or contact"),
-    db: Session = Depends(get_db)
+    search: Optional[str] = Query(None, description="Search in text, name or contact (word prefixes, ranked by relevance)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor header (replaces skip)"),
+    fields: Optional[str] = Query(None, description="'summary' or comma-separated columns to return (id and created_at are always included)"),
+    db: DatabaseSession = Depends(get_db)
 ):
-    """Get list of tickets with filtering and pagination"""
-    return crud.get_tickets(
-        db,
+    """Get list of tickets with filtering and pagination
+
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+    to fetch the next page with a constant-cost keyset lookup.
+    With `fields` only those columns are selected and the rows are
+    serialized straight to JSON, skipping ORM objects and TicketOut.
+    Pages are served from the read cache until the next write; on a miss
+    a matching If-None-Match is answered with 304 before the list query runs.
+    """
+    return await list_response(
+        request, db, cursor, fields,
         skip=skip,
         limit=limit,
         status=status,
@@ -36,53 +129,198 @@ def read_tickets(
         search=search
     )
 
-@router.get("/stats", summary="Get tickets statistics")
-def get_stats(db: Session = Depends(get_db)):
-    """Get statistics about tickets"""
-    total = crud.get_ticket_count(db)
+async def list_response(
+    request: Request,
+    db: DatabaseSession,
+    cursor: Optional[str],
+    fields: Optional[str],
+    **filters
+) -> Response:
+    """Serve a ticket list page: read cache, then ETag revalidation, then the query
+
+    Shared by GET /tickets/ and GET /users/{user_id}/tickets; `filters` are
+    the keyword arguments of crud.get_tickets other than `cursor`.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = _parse_fields(fields) if fields else None
+    filters = {"search": None, **filters, "cursor": position}
     
-    # Get count by status
-    from app.models import Ticket
-    status_counts = {
-        status.value: db.query(Ticket).filter(Ticket.status == status).count()
-        for status in TicketStatus
-    }
+    params = (tuple(sorted(filters.items())), columns)
+    key = await read_cache.list_key(params)
+    entry, token = await read_cache.lookup(key)
+    if entry is None:
+        version = await db.run(crud.get_table_version)
+        etag = make_etag("tickets", version, params)
+        response = _revalidate(request, etag)
+        if response is not None:
+            return response
+        entry = await _load_list(db, etag, columns, **filters)
+        await read_cache.store(key, entry, token)
+    return _respond(request, entry)
+
+async def _load_list(
+    db: DatabaseSession,
+    etag: str,
+    columns: Optional[Tuple[str, ...]],
+    **filters
+) -> CachedResponse:
+    """Run the list query and serialize the page with its headers"""
+    if columns:
+        # Core rows go straight to JSON: no ORM objects, no TicketOut validation
+        tickets = await db.run(crud.get_ticket_rows, columns, **filters)
+        body = [row._asdict() for row in tickets]
+    else:
+        tickets = await db.run(crud.get_tickets, **filters)
+        body = TICKET_LIST.dump_python(
+            TICKET_LIST.validate_python(tickets, from_attributes=True),
+            mode="json"
+        )
     
-    return {
-        "total": total,
-        "statuses": status_counts
-    }
+    # Ranked full-text results are not in keyset order, so they page by skip
+    search, position = filters["search"], filters["cursor"]
+    ranked = search and not position and crud.search_match(db.bind, search)
+    cursor_out = next_cursor(tickets, filters["limit"])
+    headers = cache_headers(etag)
+    if cursor_out and not ranked:
+        headers["X-Next-Cursor"] = cursor_out
+    return CachedResponse(body, headers)
+
+@router.get("/stats", summary="Get tickets statistics")
+async def get_stats(
+    request: Request,
+    db: DatabaseSession = Depends(get_db)
+):
+    """Get ticket counts by status, type, priority and status x priority"""
+    key = await read_cache.stats_key()
+    entry, token = await read_cache.lookup(key)
+    if entry is None:
+        etag = make_etag("stats", await db.run(crud.get_table_version))
+        response = _revalidate(request, etag)
+        if response is not None:
+            return response
+        entry = CachedResponse(await db.run(crud.get_ticket_stats), cache_headers(etag))
+        await read_cache.store(key, entry, token)
+    return _respond(request, entry)
+
+@router.get("/export", summary="Export tickets")
+async def export_tickets(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    status: Optional[TicketStatus] = Query(None, description="Filter by status"),
+    type: Optional[TicketType] = Query(None, description="Filter by type"),
+    priority: Optional[TicketPriority] = Query(None, description="Filter by priority"),
+    search: Optional[str] = Query(None, description="Search in text, name or contact")
+):
+    """Stream every ticket matching the filters, newest first
+
+    Rows are read from a server-side cursor and sent in fixed-size batches,
+    so memory use does not grow with the size of the archive.
+    """
+    return StreamingResponse(
+        stream_export(format, status=status, type=type, priority=priority, search=search),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets_export.{format}"'}
+    )
+
+def _create_tickets_bulk(db: Session, tickets: List[schemas.TicketCreate]) -> List[schemas.BulkItemResult]:
+    """Create tickets and build the response inside db.run, whatever expire_on_commit is"""
+    return [
+        schemas.BulkItemResult(index=i, id=ticket.id, ok=True, ticket=ticket)
+        for i, ticket in enumerate(crud.create_tickets(db, tickets))
+    ]
+
+@router.post("/bulk", response_model=List[schemas.BulkItemResult], summary="Create tickets in bulk")
+async def create_tickets_bulk(
+    tickets: List[schemas.TicketCreate],
+    db: DatabaseSession = Depends(get_db)
+):
+    """Create many tickets in a single transaction"""
+    _check_bulk_size(tickets)
+    results = await db.run(_create_tickets_bulk, tickets)
+    await read_cache.invalidate()
+    return results
+
+@router.patch("/bulk", response_model=List[schemas.BulkItemResult], summary="Update tickets in bulk")
+async def edit_tickets_bulk(
+    updates: List[schemas.TicketBulkUpdate],
+    db: DatabaseSession = Depends(get_db)
+):
+    """Update many tickets (e.g. close all resolved) in a single transaction"""
+    _check_bulk_size(updates)
+    updated = await db.run(crud.update_tickets, updates)
+    await read_cache.invalidate(*updated)
+    return [
+        schemas.BulkItemResult(index=i, id=item.id, ok=True, ticket=updated[item.id])
+        if item.id in updated else
+        schemas.BulkItemResult(index=i, id=item.id, ok=False, error="Ticket not found")
+        for i, item in enumerate(updates)
+    ]
+
+@router.delete("/bulk", response_model=List[schemas.BulkItemResult], summary="Delete tickets in bulk")
+async def delete_tickets_bulk(
+    ids: List[int] = Query(..., description="Ticket IDs to delete"),
+    db: DatabaseSession = Depends(get_db)
+):
+    """Delete many tickets with one statement (for administrators)"""
+    _check_bulk_size(ids)
+    deleted = await db.run(crud.delete_tickets, ids)
+    await read_cache.invalidate(*deleted)
+    return [
+        schemas.BulkItemResult(index=i, id=ticket_id, ok=ticket_id in deleted,
+                               error=None if ticket_id in deleted else "Ticket not found")
+        for i, ticket_id in enumerate(ids)
+    ]
 
 @router.get("/{ticket_id}", response_model=schemas.TicketOut, summary="Get ticket by ID")
-def read_ticket(
+async def read_ticket(
     ticket_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: DatabaseSession = Depends(get_db)
 ):
     """Get detailed information about specific ticket"""
-    ticket = crud.get_ticket(db, ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    return ticket
+    key = read_cache.ticket_key(ticket_id)
+    entry, token = await read_cache.lookup(key)
+    if entry is None:
+        # Revalidation only needs updated_at, not the whole row
+        if request.headers.get("if-none-match"):
+            updated_at = await db.run(crud.get_ticket_updated_at, ticket_id)
+            response = _revalidate(request, _ticket_etag(ticket_id, updated_at)) if updated_at else None
+            if response is not None:
+                return response
+        
+        ticket = await db.run(crud.get_ticket, ticket_id)
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        entry = CachedResponse(
+            schemas.TicketOut.model_validate(ticket).model_dump(mode="json"),
+            cache_headers(_ticket_etag(ticket.id, ticket.updated_at))
+        )
+        await read_cache.store(key, entry, token)
+    return _respond(request, entry)
 
 @router.patch("/{ticket_id}", response_model=schemas.TicketOut, summary="Update a ticket")
-def edit_ticket(
+async def edit_ticket(
     ticket_id: int,
     ticket_update: schemas.TicketUpdate,
-    db: Session = Depends(get_db)
+    db: DatabaseSession = Depends(get_db)
 ):
     """Update ticket (status, comment, priority, assignment)"""
-    ticket = crud.update_ticket(db, ticket_id, ticket_update)
+    ticket = await db.run(crud.update_ticket, ticket_id, ticket_update)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    await read_cache.invalidate(ticket_id)
     return ticket
 
 @router.delete("/{ticket_id}", summary="Delete a ticket")
-def delete_ticket(
+async def delete_ticket(
     ticket_id: int,
-    db: Session = Depends(get_db)
+    db: DatabaseSession = Depends(get_db)
 ):
     """Delete a ticket (for administrators)"""
-    ticket = crud.delete_ticket(db, ticket_id)
+    ticket = await db.run(crud.delete_ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    await read_cache.invalidate(ticket_id)
     return {"message": "Ticket successfully deleted"}
\ No newline at end of file
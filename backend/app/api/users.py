@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional, List
+from app import schemas
+from app.api.tickets import list_response
+from app.database import DatabaseSession, get_db
+from app.enums import TicketStatus
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("/{user_id}/tickets", response_model=List[schemas.TicketOut], summary="Get a user's tickets")
+async def read_user_tickets(
+    user_id: str,
+    request: Request,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of records per page"),
+    status: Optional[TicketStatus] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor header (replaces skip)"),
+    fields: Optional[str] = Query(None, description="'summary' or comma-separated columns to return (id and created_at are always included)"),
+    db: DatabaseSession = Depends(get_db)
+):
+    """Get tickets submitted by one user, newest first
+
+    `user_id` is the Telegram id, with or without the legacy "user_" prefix.
+    Served by the (user_id, created_at, id) index; paging, `fields` and
+    caching work as in GET /tickets/.
+    """
+    normalized = schemas.normalize_user_id(user_id)
+    if not normalized:
+        raise HTTPException(status_code=400, detail="Empty user_id")
+    return await list_response(
+        request, db, cursor, fields,
+        skip=skip,
+        limit=limit,
+        status=status,
+        user_id=normalized
+    )
@@ -0,0 +1,28 @@
+from app.cache.backends import CacheBackend, MemoryBackend
+from app.cache.read_cache import CachedResponse, ReadCache
+from app.config import settings
+
+def create_read_cache() -> ReadCache:
+    """ReadCache for the configured READ_CACHE backend ("memory", "redis" or "off")"""
+    if settings.read_cache == "memory":
+        return ReadCache(MemoryBackend(settings.read_cache_size, settings.read_cache_ttl))
+    if settings.read_cache == "redis":
+        # Imported lazily: only Redis deployments need the client installed
+        from redis.asyncio import Redis
+        from app.cache.redis import RedisBackend
+        client = Redis.from_url(settings.redis_url)
+        return ReadCache(RedisBackend(client, settings.read_cache_ttl, settings.read_cache_prefix))
+    if settings.read_cache == "off":
+        return ReadCache(None)
+    raise ValueError(f"Unknown READ_CACHE: {settings.read_cache!r}")
+
+read_cache = create_read_cache()
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "CachedResponse",
+    "ReadCache",
+    "create_read_cache",
+    "read_cache"
+]
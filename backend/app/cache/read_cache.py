@@ -0,0 +1,93 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+from app.cache.backends import CacheBackend
+
+# Bumped by every ticket write; part of every list/stats key
+GENERATION = "gen:tickets"
+
+@dataclass
+class CachedResponse:
+    """JSON-ready body of a GET plus the headers (ETag, cursor) sent with it"""
+    body: Any
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+class ReadCache:
+    """Cache of serialized ticket reads with write-through invalidation
+
+    Single tickets are keyed by id and dropped when that ticket is written.
+    Lists and stats are keyed by a generation that every write increments,
+    so a write makes all of them unreachable at once. Entries loaded while
+    a write was in flight are not stored (see `lookup`/`store`).
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def ticket_key(self, ticket_id: int) -> str:
+        return f"ticket:{ticket_id}"
+
+    async def list_key(self, params: Tuple) -> str:
+        return f"tickets:{await self._generation()}:{params!r}"
+
+    async def stats_key(self) -> str:
+        return f"stats:{await self._generation()}"
+
+    async def lookup(self, key: str) -> Tuple[Optional[CachedResponse], Optional[int]]:
+        """Cached entry for `key` (or None) and a token to pass to `store`"""
+        if not self.enabled:
+            return None, None
+        kind = key.split(":", 1)[0]
+        token = await self._generation()
+        entry = await self.backend.get(key) if token is not None else None
+        if entry is None:
+            self.misses[kind] += 1
+        else:
+            self.hits[kind] += 1
+        return entry, token
+
+    async def store(self, key: str, entry: CachedResponse, token: Optional[int]) -> None:
+        """Cache an entry unless a write committed since `lookup` returned `token`"""
+        if token is not None and await self._generation() == token:
+            await self.backend.set(key, entry)
+
+    async def invalidate(self, *ticket_ids: int) -> None:
+        """Forget lists, stats and the given tickets; call after a write commits"""
+        if not self.enabled:
+            return
+        await self.backend.incr(GENERATION)
+        if ticket_ids:
+            await self.backend.delete(*[self.ticket_key(ticket_id) for ticket_id in ticket_ids])
+
+    def info(self) -> dict[str, Any]:
+        """Hit/miss counters per kind of read, plus backend details"""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            **(self.backend.info() if self.enabled else {}),
+            "reads": {
+                kind: {
+                    "hits": self.hits[kind],
+                    "misses": self.misses[kind],
+                    "hit_ratio": round(self.hits[kind] / ((self.hits[kind] + self.misses[kind]) or 1), 3),
+                }
+                for kind in kinds
+            },
+        }
+
+    async def close(self) -> None:
+        if self.enabled:
+            await self.backend.close()
+
+    async def _generation(self) -> Optional[int]:
+        return await self.backend.get_counter(GENERATION) if self.enabled else None
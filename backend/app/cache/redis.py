@@ -0,0 +1,81 @@
+import logging
+from typing import Any, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.cache.backends import CacheBackend
+from app.cache.read_cache import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+class RedisBackend(CacheBackend):
+    """Cache shared by every worker and node through one Redis instance
+
+    Entries are orjson-encoded with a TTL (SET EX); Redis evicts them under
+    its own maxmemory policy. The generation is a plain INCR counter without
+    a TTL, so bumping it in one worker retires list/stats keys in all of them.
+    Redis errors are logged and turn into cache misses.
+    """
+
+    def __init__(self, client: Redis, ttl: float, prefix: str = "appealbot:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except RedisError as e:
+            self._failed("GET", e)
+            return None
+        if raw is None:
+            return None
+        data = orjson.loads(raw)
+        return CachedResponse(data["body"], data["headers"])
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        raw = orjson.dumps({"body": value.body, "headers": value.headers})
+        try:
+            await self.client.set(self.prefix + key, raw, px=int(self.ttl * 1000))
+        except RedisError as e:
+            self._failed("SET", e)
+
+    async def delete(self, *keys: str) -> None:
+        try:
+            await self.client.delete(*[self.prefix + key for key in keys])
+        except RedisError as e:
+            self._failed("DEL", e)
+
+    async def get_counter(self, key: str) -> Optional[int]:
+        try:
+            value = await self.client.get(self.prefix + key)
+        except RedisError as e:
+            self._failed("GET", e)
+            return None
+        return int(value or 0)
+
+    async def incr(self, key: str) -> int:
+        try:
+            return await self.client.incr(self.prefix + key)
+        except RedisError as e:
+            # Other workers keep serving the old generation until their TTL runs out
+            self._failed("INCR", e)
+            return 0
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "backend": "redis",
+            "prefix": self.prefix,
+            "ttl": self.ttl,
+            "errors": self.errors,
+        }
+
+    def _failed(self, command: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Read cache {command} failed, serving from the database: {error}")
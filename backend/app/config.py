@@ -0,0 +1,105 @@
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from sqlalchemy.engine import URL, make_url
+
+load_dotenv()
+
+@dataclass
+class Settings:
+    """Backend settings read from the environment"""
+    # DATABASE_URL wins; otherwise DB_USER/DB_HOST/... build a PostgreSQL URL
+    database_url: str = os.getenv("DATABASE_URL", "")
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    db_host: str = os.getenv("DB_HOST", "localhost")
+    db_port: int = int(os.getenv("DB_PORT", 5432))
+    db_name: str = os.getenv("DB_NAME", "support_bot")
+    db_user: str = os.getenv("DB_USER", "")
+    db_password: str = os.getenv("DB_PASSWORD", "")
+    
+    # Use an AsyncSession (aiosqlite/asyncpg) instead of threadpool-bound sync sessions
+    db_async: bool = os.getenv("DB_ASYNC", "False").lower() == "true"
+    
+    # SQLite storage profile applied to every new connection: "wal" or "default"
+    sqlite_profile: str = os.getenv("SQLITE_PROFILE", "wal").lower()
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))  # 256 MB
+    
+    # Connection pool (SQLite WAL: many readers, writes serialized by SQLite)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Server databases only: validate connections on checkout, recycle old ones
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    
+    # Keep per-(status, type, priority) counters so /tickets/stats is an O(1) read
+    stats_counters: bool = os.getenv("STATS_COUNTERS", "False").lower() == "true"
+    # "fts" uses the SQLite FTS5 index when available, "like" forces ILIKE scans
+    search_backend: str = os.getenv("SEARCH_BACKEND", "fts").lower()
+    
+    # Seconds clients may reuse a GET response before revalidating it with its ETag
+    http_cache_max_age: int = int(os.getenv("HTTP_CACHE_MAX_AGE", 0))
+    
+    # Cache of GET responses: "memory", "redis" or "off". A memory cache is only
+    # invalidated by writes in its own process, so it is the default only with a
+    # single worker (WEB_CONCURRENCY); the launcher refuses it with several
+    read_cache: str = os.getenv(
+        "READ_CACHE",
+        "memory" if int(os.getenv("WEB_CONCURRENCY", 1)) <= 1 else "off"
+    ).lower()
+    read_cache_size: int = int(os.getenv("READ_CACHE_SIZE", 1024))
+    read_cache_ttl: float = float(os.getenv("READ_CACHE_TTL", 30))
+    read_cache_prefix: str = os.getenv("READ_CACHE_PREFIX", "appealbot:")
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Opt-in response compression: brotli if the `brotli` package is installed
+    # and accepted by the client, gzip otherwise; small bodies are sent as is
+    compression: bool = os.getenv("COMPRESSION", "False").lower() == "true"
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", 6))
+    brotli_quality: int = int(os.getenv("BROTLI_QUALITY", 4))
+    
+    # PostgreSQL lock_timeout for migrations, so DDL fails fast instead of
+    # blocking all traffic while it waits behind a long transaction
+    migration_lock_timeout: str = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+    
+    # Create missing tables/indexes at startup; the launcher turns this off in
+    # its workers after doing it once itself
+    schema_setup: bool = os.getenv("SCHEMA_SETUP", "True").lower() == "true"
+    
+    # Rows fetched, encoded and sent per chunk by GET /tickets/export
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+    
+    # Seconds an Idempotency-Key of POST /tickets/ is remembered
+    idempotency_ttl: int = int(os.getenv("IDEMPOTENCY_TTL", 86400))
+    
+    def __post_init__(self):
+        if not self.database_url:
+            if self.db_user:
+                self.database_url = URL.create(
+                    "postgresql+psycopg2",
+                    username=self.db_user,
+                    password=self.db_password or None,
+                    host=self.db_host,
+                    port=self.db_port,
+                    database=self.db_name
+                ).render_as_string(hide_password=False)
+            else:
+                self.database_url = "sqlite:///./support.db"
+        
+        if not self.async_database_url:
+            self.async_database_url = async_url(self.database_url)
+
+def async_url(url: str) -> str:
+    """Async driver counterpart of a sync database URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+settings = Settings()
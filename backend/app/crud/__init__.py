@@ -1,17 +1,43 @@
 from app.crud.ticket import (
     create_ticket,
     get_tickets,
+    get_ticket_rows,
+    export_query,
     get_ticket,
+    get_ticket_updated_at,
     update_ticket,
     delete_ticket,
-    get_ticket_count
+    get_ticket_count,
+    search_match
+)
+from app.crud.bulk import create_tickets, update_tickets, delete_tickets
+from app.crud.stats import get_ticket_stats, rebuild_counters
+from app.crud.versions import get_table_version, bump_table_version
+from app.crud.idempotency import (
+    IdempotencyKeyReused,
+    create_ticket_once,
+    purge_idempotency_keys
 )
 
 __all__ = [
     "create_ticket",
     "get_tickets",
+    "get_ticket_rows",
+    "export_query",
     "get_ticket",
+    "get_ticket_updated_at",
     "update_ticket",
     "delete_ticket",
-    "get_ticket_count"
+    "get_ticket_count",
+    "search_match",
+    "create_tickets",
+    "update_tickets",
+    "delete_tickets",
+    "get_ticket_stats",
+    "rebuild_counters",
+    "get_table_version",
+    "bump_table_version",
+    "IdempotencyKeyReused",
+    "create_ticket_once",
+    "purge_idempotency_keys"
 ]
\ No newline at end of file
@@ -0,0 +1,109 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, delete
+from app import models, schemas
+from app.enums import TicketStatus, TicketPriority
+from app.crud.stats import adjust_counter
+from app.crud.versions import bump_table_version
+
+_KEY_COLUMNS = (models.Ticket.id, models.Ticket.status, models.Ticket.type, models.Ticket.priority)
+
+def _apply_counter_deltas(db: Session, deltas: Counter) -> None:
+    """One counter statement per distinct (status, type, priority), not per ticket"""
+    for key, delta in deltas.items():
+        adjust_counter(db, *key, delta)
+
+def _existing_keys(db: Session, ticket_ids: list[int]) -> dict[int, tuple]:
+    """Stats dimensions of the tickets that exist among `ticket_ids`"""
+    rows = db.execute(select(*_KEY_COLUMNS).where(models.Ticket.id.in_(set(ticket_ids))))
+    return {
+        row.id: (row.status or TicketStatus.NEW, row.type, row.priority or TicketPriority.MEDIUM)
+        for row in rows
+    }
+
+def create_tickets(db: Session, tickets: list[schemas.TicketCreate]) -> list[models.Ticket]:
+    """Insert many tickets with one executemany INSERT ... RETURNING and one commit"""
+    now = datetime.utcnow()
+    rows = [
+        {
+            **ticket.model_dump(),
+            "status": TicketStatus.NEW,
+            "created_at": now,
+            "updated_at": now
+        }
+        for ticket in tickets
+    ]
+    created = db.scalars(
+        insert(models.Ticket).returning(models.Ticket, sort_by_parameter_order=True),
+        rows
+    ).all()
+
+    _apply_counter_deltas(db, Counter(
+        (row["status"], row["type"], row["priority"]) for row in rows
+    ))
+    db.commit()
+    bump_table_version(db)
+    return created
+
+def update_tickets(
+    db: Session,
+    updates: list[schemas.TicketBulkUpdate]
+) -> dict[int, models.Ticket]:
+    """Apply many partial updates in one transaction; returns updated tickets by id
+
+    Ids that do not exist are skipped and missing from the result.
+    """
+    keys = _existing_keys(db, [item.id for item in updates])
+    final_keys = dict(keys)
+    now = datetime.utcnow()
+
+    params = []
+    for item in updates:
+        if item.id not in keys:
+            continue
+        data = item.model_dump(exclude_unset=True, exclude={"id"})
+        status, type_, priority = final_keys[item.id]
+        final_keys[item.id] = (
+            data.get("status", status) or TicketStatus.NEW,
+            type_,
+            data.get("priority", priority) or TicketPriority.MEDIUM
+        )
+        params.append({"id": item.id, "updated_at": now, **data})
+
+    if params:
+        # ORM bulk UPDATE by primary key: executemany grouped by column set
+        db.execute(update(models.Ticket), params)
+
+        deltas = Counter()
+        for ticket_id, old_key in keys.items():
+            if final_keys[ticket_id] != old_key:
+                deltas[old_key] -= 1
+                deltas[final_keys[ticket_id]] += 1
+        _apply_counter_deltas(db, deltas)
+    db.commit()
+    if params:
+        bump_table_version(db)
+
+    if not keys:
+        return {}
+    tickets = db.scalars(select(models.Ticket).where(models.Ticket.id.in_(keys)))
+    return {ticket.id: ticket for ticket in tickets}
+
+def delete_tickets(db: Session, ticket_ids: list[int]) -> set[int]:
+    """Delete many tickets with one statement; returns the ids that existed"""
+    keys = _existing_keys(db, ticket_ids)
+    if keys:
+        db.execute(
+            delete(models.Ticket)
+            .where(models.Ticket.id.in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+        deltas = Counter()
+        for key in keys.values():
+            deltas[key] -= 1
+        _apply_counter_deltas(db, deltas)
+    db.commit()
+    if keys:
+        bump_table_version(db)
+    return set(keys)
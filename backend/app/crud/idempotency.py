@@ -0,0 +1,71 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from typing import Optional, Tuple
+from app import models, schemas
+from app.config import settings
+from app.crud.ticket import add_ticket, get_ticket
+from app.crud.versions import bump_table_version
+
+# Expired keys removed per new key, so the sweep stays cheap and continuous
+PURGE_BATCH = 100
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+def request_fingerprint(ticket: schemas.TicketCreate) -> str:
+    return blake2b(ticket.model_dump_json().encode(), digest_size=16).hexdigest()
+
+def _cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.idempotency_ttl)
+
+def _live_key(db: Session, key: str) -> Optional[models.IdempotencyKey]:
+    table = models.IdempotencyKey
+    return db.scalar(select(table).where(table.key == key, table.created_at >= _cutoff()))
+
+def purge_idempotency_keys(db: Session, limit: Optional[int] = None) -> int:
+    """Delete keys older than IDEMPOTENCY_TTL (at most `limit`) in the caller's transaction"""
+    table = models.IdempotencyKey
+    expired = select(table.key).where(table.created_at < _cutoff())
+    if limit:
+        expired = expired.limit(limit)
+    return db.execute(
+        delete(table).where(table.key.in_(expired)).execution_options(synchronize_session=False)
+    ).rowcount
+
+def create_ticket_once(
+    db: Session,
+    ticket: schemas.TicketCreate,
+    key: str
+) -> Tuple[Optional[models.Ticket], bool]:
+    """Create a ticket unless `key` already created one; returns (ticket, replayed)
+
+    The key row is committed in the same transaction as the ticket, so a
+    retry after a lost response finds it. Concurrent requests with the same
+    key race on its primary key; the loser replays the winner's ticket.
+    Raises IdempotencyKeyReused if the key came with a different body.
+    The ticket is None when it was deleted after being created.
+    """
+    fingerprint = request_fingerprint(ticket)
+    record = _live_key(db, key)
+    if record is None:
+        purge_idempotency_keys(db, PURGE_BATCH)  # also frees an expired row with this key
+        db_ticket = add_ticket(db, ticket)
+        db.add(models.IdempotencyKey(key=key, ticket_id=db_ticket.id, fingerprint=fingerprint))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            record = _live_key(db, key)
+            if record is None:
+                raise
+        else:
+            bump_table_version(db)
+            db.refresh(db_ticket)
+            return db_ticket, False
+    
+    if record.fingerprint != fingerprint:
+        raise IdempotencyKeyReused(key)
+    return get_ticket(db, record.ticket_id), True
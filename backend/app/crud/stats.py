@@ -0,0 +1,131 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, insert, update, delete, text
+from typing import Any, Iterable, Tuple
+from app import models
+from app.config import settings
+from app.database import upsert_insert
+from app.enums import TicketStatus, TicketType, TicketPriority
+
+# (status, type, priority, count)
+CounterRow = Tuple[TicketStatus, TicketType, TicketPriority, int]
+
+def grouped_counts_query():
+    """One pass over the tickets table grouped by every stats dimension"""
+    return (
+        select(
+            models.Ticket.status,
+            models.Ticket.type,
+            models.Ticket.priority,
+            func.count().label("count")
+        )
+        .group_by(models.Ticket.status, models.Ticket.priority, models.Ticket.type)
+    )
+
+def _summarize(rows: Iterable[CounterRow]) -> dict[str, Any]:
+    """Fold (status, type, priority, count) rows into the stats response"""
+    statuses = {status.value: 0 for status in TicketStatus}
+    types = {type_.value: 0 for type_ in TicketType}
+    priorities = {priority.value: 0 for priority in TicketPriority}
+    status_priority = {
+        status.value: {priority.value: 0 for priority in TicketPriority}
+        for status in TicketStatus
+    }
+    total = 0
+
+    for status, type_, priority, count in rows:
+        if not count:
+            continue
+        total += count
+        # Legacy rows may have NULL status/priority; count them as the defaults
+        status = (status or TicketStatus.NEW).value
+        priority = (priority or TicketPriority.MEDIUM).value
+        statuses[status] += count
+        priorities[priority] += count
+        status_priority[status][priority] += count
+        if type_:
+            types[type_.value] += count
+
+    return {
+        "total": total,
+        "statuses": statuses,
+        "types": types,
+        "priorities": priorities,
+        "status_priority": status_priority
+    }
+
+def get_ticket_stats(db: Session) -> dict[str, Any]:
+    """Get ticket counts by status, type, priority and status x priority"""
+    if settings.stats_counters:
+        rows = db.execute(
+            select(
+                models.TicketCounter.status,
+                models.TicketCounter.type,
+                models.TicketCounter.priority,
+                models.TicketCounter.count
+            )
+        ).all()
+    else:
+        rows = db.execute(grouped_counts_query()).all()
+    return _summarize(rows)
+
+def adjust_counter(
+    db: Session,
+    status: TicketStatus,
+    type: TicketType,
+    priority: TicketPriority,
+    delta: int
+) -> None:
+    """Add `delta` to a counter row in the caller's transaction (no commit)"""
+    if not settings.stats_counters or not delta:
+        return
+
+    counter = models.TicketCounter
+    upsert = upsert_insert(db.get_bind())
+    if upsert is None:
+        result = db.execute(
+            update(counter)
+            .where(
+                counter.status == status,
+                counter.type == type,
+                counter.priority == priority
+            )
+            .values(count=counter.count + delta)
+        )
+        if result.rowcount == 0:
+            db.execute(
+                insert(counter).values(status=status, type=type, priority=priority, count=delta)
+            )
+        return
+
+    # One statement, so two first writers of a key cannot both INSERT it
+    db.execute(
+        upsert(counter)
+        .values(status=status, type=type, priority=priority, count=delta)
+        .on_conflict_do_update(
+            index_elements=[counter.status, counter.type, counter.priority],
+            set_={"count": counter.count + delta}
+        )
+    )
+
+def rebuild_counters(db: Session) -> None:
+    """Recompute every counter row from the tickets table"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Hold off ticket writes (and other nodes' rebuilds) until commit, so a
+        # counter change cannot land between the grouped read and the DELETE
+        db.execute(text(f"LOCK TABLE {models.Ticket.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    counts: dict[tuple, int] = {}
+    for status, type_, priority, count in db.execute(grouped_counts_query()):
+        key = (status or TicketStatus.NEW, type_, priority or TicketPriority.MEDIUM)
+        counts[key] = counts.get(key, 0) + count
+
+    db.execute(delete(models.TicketCounter))
+    if counts:
+        db.execute(
+            insert(models.TicketCounter),
+            [
+                {"status": status, "type": type_, "priority": priority, "count": count}
+                for (status, type_, priority), count in counts.items()
+            ]
+        )
+    db.commit()
@@ -1,12 +1,29 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import or_, tuple_, select, update, delete
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+from typing import Optional, Sequence
+from datetime import datetime
 from app import models, schemas
+from app.config import settings
 from app.enums import TicketStatus, TicketType, TicketPriority
+from app.pagination import Cursor
+from app import search as search_index
+from app.crud.stats import adjust_counter
+from app.crud.versions import bump_table_version
 
-def create_ticket(db: Session, ticket: schemas.TicketCreate) -> models.Ticket:
-    """Create a new ticket"""
+def _counter_key(ticket: models.Ticket) -> tuple:
+    """Stats dimensions of a ticket, as stored in ticket_counters"""
+    return (
+        ticket.status or TicketStatus.NEW,
+        ticket.type,
+        ticket.priority or TicketPriority.MEDIUM
+    )
+
+def add_ticket(db: Session, ticket: schemas.TicketCreate) -> models.Ticket:
+    """Insert a ticket and its counter update in the caller's transaction (commit, then bump_table_version)"""
     db_ticket = models.Ticket(
+        user_id=ticket.user_id,
         full_name=ticket.full_name,
         contact=ticket.contact,
         type=ticket.type,
@@ -14,73 +31,295 @@ def create_ticket(db: Session, ticket: schemas.TicketCreate) -> models.Ticket:
         priority=ticket.priority
     )
     db.add(db_ticket)
+    db.flush()
+    adjust_counter(db, *_counter_key(db_ticket), 1)
+    return db_ticket
+
+def create_ticket(db: Session, ticket: schemas.TicketCreate) -> models.Ticket:
+    """Create a new ticket"""
+    db_ticket = add_ticket(db, ticket)
     db.commit()
+    bump_table_version(db)
     db.refresh(db_ticket)
     return db_ticket
 
-def get_tickets(
-    db: Session,
-    skip: int = 0,
-    limit: int = 20,
+def search_match(bind, search: str) -> Optional[str]:
+    """FTS5 match expression for `search`, or None when ILIKE must be used"""
+    if not search_index.fts_enabled(bind):
+        return None
+    return search_index.match_expression(search)
+
+def _apply_filters(
+    query,
+    bind,
     status: Optional[TicketStatus] = None,
     type: Optional[TicketType] = None,
     priority: Optional[TicketPriority] = None,
-    search: Optional[str] = None
-) -> list[models.Ticket]:
-    """Get list of tickets with filtering"""
-    query = db.query(models.Ticket)
-    
-    # Apply filters
+    search: Optional[str] = None,
+    user_id: Optional[str] = None,
+    ranked: bool = False
+):
+    """Add the list filters to an ORM Query or Core select; returns (query, FTS match)
+
+    With `ranked` the FTS table is joined so results can be ordered by bm25.
+    Otherwise matches are an IN list probed while walking a created_at index,
+    so newest-first pages and exports need no temp sort of every match.
+    """
+    if user_id:
+        query = query.where(models.Ticket.user_id == user_id)
     if status:
-        query = query.filter(models.Ticket.status == status)
+        query = query.where(models.Ticket.status == status)
     if type:
-        query = query.filter(models.Ticket.type == type)
+        query = query.where(models.Ticket.type == type)
     if priority:
-        query = query.filter(models.Ticket.priority == priority)
-    if search:
+        query = query.where(models.Ticket.priority == priority)
+    match = search_match(bind, search) if search else None
+    if match and ranked:
+        query = query.join(
+            search_index.fts_table,
+            search_index.fts_table.c.rowid == models.Ticket.id
+        ).where(search_index.match_clause(match))
+    elif match:
+        matches = select(search_index.fts_table.c.rowid).where(search_index.match_clause(match))
+        # "+ 0" keeps SQLite from driving the query by rowid lookups from the list
+        query = query.where((models.Ticket.id + 0).in_(matches))
+    elif search:
         search_term = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             or_(
                 models.Ticket.full_name.ilike(search_term),
                 models.Ticket.text.ilike(search_term),
                 models.Ticket.contact.ilike(search_term)
             )
         )
+    return query, match
+
+def tickets_query(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    status: Optional[TicketStatus] = None,
+    type: Optional[TicketType] = None,
+    priority: Optional[TicketPriority] = None,
+    search: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+    user_id: Optional[str] = None
+) -> Query:
+    """Build the list query used by get_tickets (also inspected by app.query_plans)"""
+    query, match = _apply_filters(
+        db.query(models.Ticket), db.get_bind(), status, type, priority, search, user_id,
+        ranked=not cursor
+    )
+    
+    # Full-text matches are ranked by bm25 unless the caller pages by cursor
+    if match and not cursor:
+        query = query.order_by(search_index.rank_column())
     
-    # Return with pagination
-    return query.order_by(models.Ticket.created_at.desc()).offset(skip).limit(limit).all()
+    # Newest first; id breaks ties between tickets created in the same instant
+    query = query.order_by(models.Ticket.created_at.desc(), models.Ticket.id.desc())
+    
+    # Apply pagination
+    if cursor:
+        query = query.filter(
+            tuple_(models.Ticket.created_at, models.Ticket.id) < tuple_(*cursor)
+        )
+        return query.limit(limit)
+    return query.offset(skip).limit(limit)
+
+def export_query(
+    bind,
+    columns: Sequence[str],
+    status: Optional[TicketStatus] = None,
+    type: Optional[TicketType] = None,
+    priority: Optional[TicketPriority] = None,
+    search: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> Select:
+    """Every ticket matching the list filters, newest first, as Core rows of `columns`"""
+    table = models.Ticket.__table__
+    query, _ = _apply_filters(
+        select(*[table.c[name] for name in columns]).select_from(table),
+        bind, status, type, priority, search, user_id
+    )
+    return query.order_by(models.Ticket.created_at.desc(), models.Ticket.id.desc())
+
+def get_tickets(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    status: Optional[TicketStatus] = None,
+    type: Optional[TicketType] = None,
+    priority: Optional[TicketPriority] = None,
+    search: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+    user_id: Optional[str] = None
+) -> list[models.Ticket]:
+    """Get list of tickets with filtering
+
+    With `cursor` the page starts right after the given (created_at, id)
+    position and `skip` is ignored, so deep pages cost the same as the first.
+    `user_id` (normalized, see schemas.normalize_user_id) limits the list to
+    one user's tickets.
+    """
+    return tickets_query(
+        db,
+        skip=skip,
+        limit=limit,
+        status=status,
+        type=type,
+        priority=priority,
+        search=search,
+        cursor=cursor,
+        user_id=user_id
+    ).all()
+
+def get_ticket_rows(
+    db: Session,
+    fields: Sequence[str],
+    skip: int = 0,
+    limit: int = 20,
+    status: Optional[TicketStatus] = None,
+    type: Optional[TicketType] = None,
+    priority: Optional[TicketPriority] = None,
+    search: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+    user_id: Optional[str] = None
+) -> list[Row]:
+    """Same page as get_tickets, but only the named columns as Core rows
+
+    `id` and `created_at` are always selected, since the next cursor is built
+    from them. No ORM objects are created, so wide columns like `text` cost
+    nothing unless requested.
+    """
+    names = dict.fromkeys(("id", "created_at", *fields))
+    columns = [models.Ticket.__table__.c[name] for name in names]
+    return tickets_query(
+        db,
+        skip=skip,
+        limit=limit,
+        status=status,
+        type=type,
+        priority=priority,
+        search=search,
+        cursor=cursor,
+        user_id=user_id
+    ).with_entities(*columns).all()
 
 def get_ticket(db: Session, ticket_id: int) -> Optional[models.Ticket]:
     """Get ticket by ID"""
     return db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
 
-def update_ticket(
+def get_ticket_updated_at(db: Session, ticket_id: int) -> Optional[datetime]:
+    """Last modification time of a ticket (ETag check without loading the row)"""
+    return db.scalar(select(models.Ticket.updated_at).where(models.Ticket.id == ticket_id))
+
+def _same(column, value):
+    """Equality that also matches NULL (legacy rows without status/priority)"""
+    return column.is_(None) if value is None else column == value
+
+def _update_ticket_orm(
     db: Session,
     ticket_id: int,
-    ticket_update: schemas.TicketUpdate
+    update_data: dict
 ) -> Optional[models.Ticket]:
-    """Update a ticket"""
+    """SELECT + flush fallback for databases without UPDATE ... RETURNING"""
     ticket = get_ticket(db, ticket_id)
     if not ticket:
         return None
     
-    # Update only provided fields
-    update_data = ticket_update.model_dump(exclude_unset=True)
+    old_key = _counter_key(ticket)
     for key, value in update_data.items():
         setattr(ticket, key, value)
     
+    new_key = _counter_key(ticket)
+    if new_key != old_key:
+        adjust_counter(db, *old_key, -1)
+        adjust_counter(db, *new_key, 1)
+    
     db.commit()
+    bump_table_version(db)
     db.refresh(ticket)
     return ticket
 
+def update_ticket(
+    db: Session,
+    ticket_id: int,
+    ticket_update: schemas.TicketUpdate
+) -> Optional[models.Ticket]:
+    """Update a ticket with a single UPDATE ... RETURNING statement"""
+    # Update only provided fields
+    update_data = ticket_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return get_ticket(db, ticket_id)
+    if not db.get_bind().dialect.update_returning:
+        return _update_ticket_orm(db, ticket_id, update_data)
+    
+    stmt = (
+        update(models.Ticket)
+        .where(models.Ticket.id == ticket_id)
+        .values(**update_data)
+        .returning(models.Ticket)
+        .execution_options(synchronize_session=False)
+    )
+    
+    counted = settings.stats_counters and ("status" in update_data or "priority" in update_data)
+    if not counted:
+        ticket = db.scalars(stmt).first()
+        db.commit()
+        if ticket:
+            bump_table_version(db)
+        return ticket
+    
+    # Counters need the previous status/priority, which RETURNING cannot give:
+    # read them, then update only if no concurrent write changed them meanwhile
+    for _ in range(3):
+        old = db.execute(
+            select(models.Ticket.status, models.Ticket.priority)
+            .where(models.Ticket.id == ticket_id)
+        ).first()
+        if old is None:
+            db.rollback()
+            return None
+        
+        ticket = db.scalars(stmt.where(
+            _same(models.Ticket.status, old.status),
+            _same(models.Ticket.priority, old.priority)
+        )).first()
+        if ticket is None:
+            continue
+        
+        old_key = (old.status or TicketStatus.NEW, ticket.type, old.priority or TicketPriority.MEDIUM)
+        new_key = _counter_key(ticket)
+        if new_key != old_key:
+            adjust_counter(db, *old_key, -1)
+            adjust_counter(db, *new_key, 1)
+        db.commit()
+        bump_table_version(db)
+        return ticket
+    
+    db.rollback()
+    return _update_ticket_orm(db, ticket_id, update_data)
+
 def delete_ticket(db: Session, ticket_id: int) -> Optional[models.Ticket]:
-    """Delete a ticket"""
-    ticket = get_ticket(db, ticket_id)
+    """Delete a ticket with a single DELETE ... RETURNING statement"""
+    if not db.get_bind().dialect.delete_returning:
+        ticket = get_ticket(db, ticket_id)
+        if ticket:
+            db.delete(ticket)
+    else:
+        ticket = db.scalars(
+            delete(models.Ticket)
+            .where(models.Ticket.id == ticket_id)
+            .returning(models.Ticket)
+            .execution_options(synchronize_session=False)
+        ).first()
+    
     if not ticket:
         return None
     
-    db.delete(ticket)
+    adjust_counter(db, *_counter_key(ticket), -1)
     db.commit()
+    bump_table_version(db)
     return ticket
 
 def get_ticket_count(db: Session) -> int:
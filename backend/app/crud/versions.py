@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update
+from app import models
+from app.database import upsert_insert
+
+# Version of the tickets table: list pages and stats derive their ETags from it
+TICKETS = "tickets"
+
+def get_table_version(db: Session, name: str = TICKETS) -> int:
+    """Current change counter of a table (0 before its first write)"""
+    version = db.scalar(
+        select(models.TableVersion.version).where(models.TableVersion.name == name)
+    )
+    return version or 0
+
+def bump_table_version(db: Session, name: str = TICKETS) -> None:
+    """Increment a table's change counter in its own transaction; call after the write commits"""
+    # A short transaction of its own: concurrent writers never hold this row's
+    # lock for their whole transaction, so they don't queue behind each other
+    table = models.TableVersion
+    upsert = upsert_insert(db.get_bind())
+    if upsert is None:
+        result = db.execute(
+            update(table)
+            .where(table.name == name)
+            .values(version=table.version + 1)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(name=name, version=1))
+    else:
+        db.execute(
+            upsert(table)
+            .values(name=name, version=1)
+            .on_conflict_do_update(index_elements=[table.name], set_={"version": table.version + 1})
+        )
+    db.commit()
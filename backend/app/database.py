@@ -1,29 +1,156 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Any, Callable, Optional, TypeVar, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 
-# Database URL for SQLite
-DATABASE_URL = "sqlite:///./support.db"
+T = TypeVar("T")
 
-# Create database engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Database URLs (SQLite by default, PostgreSQL for multi-node deployments)
+DATABASE_URL = settings.database_url
+ASYNC_DATABASE_URL = settings.async_database_url
+
+def sqlite_pragmas(profile: str) -> dict[str, Any]:
+    """PRAGMAs for a storage profile, applied to each new SQLite connection
+
+    "wal" lets readers run alongside the single writer, fsyncs only at
+    checkpoints (synchronous=NORMAL) and waits on locks instead of failing
+    with "database is locked". "default" keeps SQLite's own settings.
+    """
+    if profile == "default":
+        return {"busy_timeout": settings.sqlite_busy_timeout_ms}
+    if profile == "wal":
+        return {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": settings.sqlite_busy_timeout_ms,
+            "cache_size": -settings.sqlite_cache_size_kb,  # negative = KiB
+            "mmap_size": settings.sqlite_mmap_size,
+            "temp_store": "MEMORY",
+        }
+    raise ValueError(f"Unknown SQLITE_PROFILE: {profile!r}")
+
+def _install_pragmas(sync_engine: Engine, profile: str) -> None:
+    """Run the profile's PRAGMAs whenever the pool opens a connection"""
+    pragmas = sqlite_pragmas(profile)
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def upsert_insert(bind) -> Optional[Callable]:
+    """Dialect insert() supporting ON CONFLICT DO UPDATE, or None for other databases"""
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert
+    if dialect == "postgresql":
+        return postgresql_insert
+    return None
+
+def _engine_options(url: str) -> dict[str, Any]:
+    """Pool and driver options for the backend behind `url`"""
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        # Drop connections killed by the server/proxy before handing them out
+        options["pool_pre_ping"] = settings.db_pool_pre_ping
+        options["pool_recycle"] = settings.db_pool_recycle
+    return options
+
+def create_db_engine(url: str = DATABASE_URL, profile: Optional[str] = None) -> Engine:
+    """Sync engine with the configured pool (and storage profile on SQLite)"""
+    db_engine = create_engine(url, poolclass=QueuePool, **_engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        _install_pragmas(db_engine, profile or settings.sqlite_profile)
+    return db_engine
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL, profile: Optional[str] = None) -> AsyncEngine:
+    """Async engine with the same pool settings and storage profile"""
+    # aiosqlite defaults to NullPool, which reopens the file for every session
+    db_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **_engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        _install_pragmas(db_engine.sync_engine, profile or settings.sqlite_profile)
+    return db_engine
+
+# Create database engine (also used for schema setup in async mode)
+engine = create_db_engine()
 
 # Create session factory
+# Rows returned by CRUD calls are complete (RETURNING/refresh), so committing
+# must not expire them: serializing them would re-SELECT on the event loop
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine
 )
 
+# Async engine and session factory, created only when DB_ASYNC is enabled
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    async_engine = create_async_db_engine()
+    # Results are serialized after the CRUD call returns, so keep them loaded
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 # Base class for models
 Base = declarative_base()
 
+class DatabaseSession:
+    """Request-scoped session that runs the sync CRUD functions in either engine mode
+
+    Async mode drives the ORM code on the event loop via AsyncSession.run_sync;
+    sync mode hands each call to the threadpool, as sync routes used to.
+    """
+
+    def __init__(self, session: Union[Session, AsyncSession]):
+        self.session = session
+
+    @property
+    def bind(self) -> Engine:
+        """Sync engine behind the session (dialect checks, raw connections)"""
+        if isinstance(self.session, AsyncSession):
+            return self.session.bind.sync_engine
+        return self.session.get_bind()
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call fn(session, *args, **kwargs) without blocking the event loop"""
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def close(self) -> None:
+        if isinstance(self.session, AsyncSession):
+            await self.session.close()
+        else:
+            await run_in_threadpool(self.session.close)
+
 # Database session dependency
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    if AsyncSessionLocal is not None:
+        db = DatabaseSession(AsyncSessionLocal())
+    else:
+        db = DatabaseSession(SessionLocal())
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
@@ -0,0 +1,79 @@
+import csv
+import io
+from typing import AsyncIterator, Iterable, Iterator, Sequence
+
+import orjson
+from sqlalchemy.engine import Row
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal, engine
+
+# Every TicketOut column, id first
+EXPORT_COLUMNS = (
+    "id", "user_id", "type", "status", "priority", "full_name", "contact", "text",
+    "admin_comment", "assigned_to", "created_at", "updated_at"
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",  # Starlette appends charset=utf-8
+}
+
+def ndjson_chunk(rows: Iterable[Row]) -> bytes:
+    """One JSON object per line"""
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+def csv_chunk(rows: Iterable[Row], header: Sequence[str] = ()) -> bytes:
+    """CSV lines for a batch, preceded by `header` if given"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    for row in rows:
+        writer.writerow([
+            "" if value is None else getattr(value, "value", value)
+            for value in row
+        ])
+    return buffer.getvalue().encode()
+
+def _sync_batches(**filters) -> Iterator[list[Row]]:
+    """Stream rows from a server-side cursor on a session owned by the export"""
+    stmt = crud.export_query(engine, EXPORT_COLUMNS, **filters)
+    with SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=settings.export_batch_size))
+        yield from result.partitions()
+
+async def _async_batches(**filters) -> AsyncIterator[list[Row]]:
+    stmt = crud.export_query(engine, EXPORT_COLUMNS, **filters)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.export_batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+async def stream_export(format: str, **filters) -> AsyncIterator[bytes]:
+    """Encoded export chunks, one per batch of EXPORT_BATCH_SIZE rows
+
+    The export opens its own session instead of the request's, since the
+    body is still streaming after the endpoint has returned. Only one
+    batch is held in memory at a time.
+    """
+    encode = csv_chunk if format == "csv" else ndjson_chunk
+    if format == "csv":
+        # Sent before the query runs, so the client gets bytes immediately
+        yield csv_chunk((), EXPORT_COLUMNS)
+    
+    if AsyncSessionLocal is not None:
+        async for batch in _async_batches(**filters):
+            yield encode(batch)
+        return
+    
+    # Sync engine: each batch is fetched in the threadpool
+    batches = _sync_batches(**filters)
+    try:
+        while (batch := await run_in_threadpool(next, batches, None)) is not None:
+            yield encode(batch)
+    finally:
+        # Also runs when the client disconnects mid-export
+        await run_in_threadpool(batches.close)
@@ -0,0 +1,37 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from app.config import settings
+
+def make_etag(*parts) -> str:
+    """Weak validator built from the values that identify a representation"""
+    digest = hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(),
+        digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """ETag plus Cache-Control: clients may reuse the body, but must revalidate"""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.http_cache_max_age}, must-revalidate",
+    }
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Whether If-None-Match already names `etag` (weak comparison, RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the validators"""
+    # Same Vary as the negotiated 200, so caches don't apply it to another format
+    return Response(status_code=304, headers={**cache_headers(etag), "Vary": "Accept"})
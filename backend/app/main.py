@@ -1,50 +1,134 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.api import tickets_router
-from app.models import ticket  # Import model for table creation
-
-# Create FastAPI instance
-app = FastAPI(
-    title="Support Service API for Educational Organizations",
-    description="Module for receiving and processing user requests",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS configuration (for frontend connection)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Replace with specific domains in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Create database tables on startup
-Base.metadata.create_all(bind=engine)
-
-# Include routers
-app.include_router(tickets_router)
-
-@app.get("/", tags=["Info"])
-def root():
-    """API health check"""
-    return {
-        "message": "Support Service API is running",
-        "docs": "/docs",
-        "endpoints": {
-            "create_ticket": "POST /tickets/",
-            "get_tickets": "GET /tickets/",
-            "get_ticket": "GET /tickets/{id}",
-            "update_ticket": "PATCH /tickets/{id}",
-            "delete_ticket": "DELETE /tickets/{id}",
-            "stats": "GET /tickets/stats"
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import inspect
+from starlette.concurrency import run_in_threadpool
+from app.cache import read_cache
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.crud import rebuild_counters, purge_idempotency_keys
+from app.database import engine, async_engine, Base, SessionLocal
+from app.search import install_search_index
+from app.api import tickets_router, users_router
+from app.models import ticket, stats, version, idempotency  # Import models for table creation
+
+def is_migrated() -> bool:
+    """Whether Alembic manages the schema (its version table exists)"""
+    return inspect(engine).has_table("alembic_version")
+
+def prepare_database() -> None:
+    """Create missing tables and indexes, then resync derived data
+
+    Skipped entirely when SCHEMA_SETUP=false (the launcher has already done it
+    once for all workers); create_all is skipped on Alembic-managed databases.
+    """
+    if not settings.schema_setup:
+        return
+
+    if not is_migrated():
+        Base.metadata.create_all(bind=engine)
+
+        # create_all skips existing tables, so add indexes introduced after the table
+        for index in ticket.Ticket.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    with SessionLocal() as db:
+        # Counters are only maintained while enabled, so resync them on every start
+        if settings.stats_counters:
+            rebuild_counters(db)
+        
+        # Creates also purge a few expired keys; clear any backlog at startup
+        purge_idempotency_keys(db)
+        db.commit()
+
+def enable_search_index() -> None:
+    """Full-text search index (SQLite FTS5); ILIKE search is used without it
+
+    Runs in every process: besides creating the index it switches this
+    process's search over to it.
+    """
+    with engine.connect() as conn:
+        install_search_index(conn)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Schema work at startup, connection cleanup at shutdown"""
+    await run_in_threadpool(prepare_database)
+    await run_in_threadpool(enable_search_index)
+
+    yield
+
+    # Close pooled database and cache connections
+    await read_cache.close()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+def create_app() -> FastAPI:
+    """Build the API application; no database work happens until startup"""
+    app = FastAPI(
+        title="Support Service API for Educational Organizations",
+        description="Module for receiving and processing user requests",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+
+    # CORS configuration (for frontend connection)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Replace with specific domains in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
+    )
+
+    # Compress large responses such as ticket lists with long texts (opt-in)
+    if settings.compression:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_size,
+            gzip_level=settings.gzip_level,
+            brotli_quality=settings.brotli_quality
+        )
+
+    # Include routers
+    app.include_router(tickets_router)
+    app.include_router(users_router)
+
+    @app.get("/", tags=["Info"])
+    def root():
+        """API health check"""
+        return {
+            "message": "Support Service API is running",
+            "docs": "/docs",
+            "endpoints": {
+                "create_ticket": "POST /tickets/",
+                "get_tickets": "GET /tickets/",
+                "get_ticket": "GET /tickets/{id}",
+                "update_ticket": "PATCH /tickets/{id}",
+                "delete_ticket": "DELETE /tickets/{id}",
+                "stats": "GET /tickets/stats",
+                "export": "GET /tickets/export?format=ndjson|csv",
+                "user_tickets": "GET /users/{user_id}/tickets"
+            }
         }
-    }
 
-@app.get("/health", tags=["Info"])
-def health_check():
-    """Service health check"""
-    return {"status": "healthy"}
\ No newline at end of file
+    @app.get("/cache", tags=["Info"])
+    def cache_info():
+        """Read cache hit/miss counters"""
+        return read_cache.info()
+
+    @app.get("/health", tags=["Info"])
+    def health_check():
+        """Service health check"""
+        return {"status": "healthy"}
+
+    return app
+
+# Module-level instance for `uvicorn app.main:app`
+app = create_app()
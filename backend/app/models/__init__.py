@@ -1,3 +1,6 @@
 from app.models.ticket import Ticket
+from app.models.stats import TicketCounter
+from app.models.version import TableVersion
+from app.models.idempotency import IdempotencyKey
 
-__all__ = ["Ticket"]
\ No newline at end of file
+__all__ = ["Ticket", "TicketCounter", "TableVersion", "IdempotencyKey"]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+class IdempotencyKey(Base):
+    """Idempotency-Key of a POST /tickets/ request and the ticket it created"""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    ticket_id = Column(Integer, nullable=False)
+    # Hash of the request body: a reused key with a different body is rejected
+    fingerprint = Column(String(32), nullable=False)
+    # Indexed for the expiry sweep (IDEMPOTENCY_TTL)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<IdempotencyKey({self.key!r} -> {self.ticket_id})>"
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Enum
+from app.database import Base
+from app.enums import TicketStatus, TicketType, TicketPriority
+
+class TicketCounter(Base):
+    """Precomputed number of tickets per (status, type, priority)"""
+    __tablename__ = "ticket_counters"
+
+    status = Column(Enum(TicketStatus, native_enum=False), primary_key=True)
+    type = Column(Enum(TicketType, native_enum=False), primary_key=True)
+    priority = Column(Enum(TicketPriority, native_enum=False), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TicketCounter({self.status}, {self.type}, {self.priority}: {self.count})>"
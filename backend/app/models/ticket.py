@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Index
 from datetime import datetime
 from app.database import Base
 from app.enums import TicketStatus, TicketType, TicketPriority
@@ -6,6 +6,20 @@ from app.enums import TicketStatus, TicketType, TicketPriority
 class Ticket(Base):
     """Model for storing support tickets"""
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Serves ORDER BY created_at DESC, id DESC and keyset cursor pagination
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # One index per list filter; the trailing (created_at, id) keeps the
+        # filtered rows in page order, so no temp sort is needed
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        Index("ix_tickets_type_created_at", "type", "created_at", "id"),
+        Index("ix_tickets_priority_created_at", "priority", "created_at", "id"),
+        # Covering index for the single-pass GROUP BY behind /tickets/stats;
+        # (created_at, id) also keeps lists filtered on all three in page order
+        Index("ix_tickets_status_priority_type_created_at", "status", "priority", "type", "created_at", "id"),
+        # One user's tickets, newest first (GET /users/{user_id}/tickets)
+        Index("ix_tickets_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     # Basic fields
     id = Column(Integer, primary_key=True, index=True)
@@ -13,19 +27,20 @@ class Ticket(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # User information
+    user_id = Column(String(255), nullable=True)  # normalized Telegram id, e.g. "12345"
     full_name = Column(String(255), nullable=False)
     contact = Column(String(255), nullable=False)
     
     # Ticket content
-    type = Column(Enum(TicketType), nullable=False)
+    type = Column(Enum(TicketType, native_enum=False), nullable=False)
     text = Column(Text, nullable=False)
     
     # Status and comments
-    status = Column(Enum(TicketStatus), default=TicketStatus.NEW)
+    status = Column(Enum(TicketStatus, native_enum=False), default=TicketStatus.NEW)
     admin_comment = Column(Text, nullable=True)
     
     # Additional fields (enhancements)
-    priority = Column(Enum(TicketPriority), default=TicketPriority.MEDIUM)
+    priority = Column(Enum(TicketPriority, native_enum=False), default=TicketPriority.MEDIUM)
     assigned_to = Column(String(255), nullable=True)
     
     def __repr__(self):
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class TableVersion(Base):
+    """Change counter of a table, bumped by every write (ETags for lists and stats)"""
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TableVersion({self.name}: {self.version})>"
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Keyset position: (created_at, id) of the last ticket on the previous page
+Cursor = Tuple[datetime, int]
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    """Build an opaque cursor pointing right after the given ticket"""
+    payload = json.dumps([created_at.isoformat(), ticket_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Parse a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this was the last page"""
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
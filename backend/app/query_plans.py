@@ -0,0 +1,127 @@
+"""Query-plan regression checks for the tickets table.
+
+Runs EXPLAIN QUERY PLAN over every query shape the ticket CRUD can emit
+and reports shapes that fall back to a full table scan or a temp sort.
+
+    python -m app.query_plans            # fresh in-memory schema from the models
+    python -m app.query_plans --url sqlite:///./support.db
+
+Exits with status 1 when any shape regresses, so it can gate CI.
+"""
+import argparse
+import itertools
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud.stats import grouped_counts_query
+from app.crud.ticket import export_query, tickets_query
+from app.database import Base
+from app.enums import TicketStatus, TicketType, TicketPriority
+from app.search import install_search_index
+
+# Plan details that mean the whole table (or a temp b-tree) is walked
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+_TEMP_SORT = "USE TEMP B-TREE"
+# Ranked search sorts its matches by relevance; no index can provide that order
+_RANKED = re.compile(r"ORDER BY bm25\(")
+
+_FILTER_VALUES = {
+    "status": TicketStatus.NEW,
+    "type": TicketType.QUESTION,
+    "priority": TicketPriority.HIGH,
+    "search": "printer",
+    "user_id": "12345",
+}
+
+@contextmanager
+def _explain(conn: Connection) -> Iterator[None]:
+    """Prefix every statement executed on `conn` with EXPLAIN QUERY PLAN"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        return f"EXPLAIN QUERY PLAN {statement}", parameters
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+
+def iter_query_shapes(db: Session) -> Iterator[Tuple[str, object]]:
+    """Yield (name, statement) for every list and count shape"""
+    cursor = (datetime.utcnow(), 1_000_000)
+    filters = list(_FILTER_VALUES)
+
+    for size in range(len(filters) + 1):
+        for combo in itertools.combinations(filters, size):
+            kwargs = {name: _FILTER_VALUES[name] for name in combo}
+            label = "+".join(combo) or "unfiltered"
+            yield f"list[{label}]", tickets_query(db, skip=40, **kwargs).statement
+            yield f"list[{label}] cursor", tickets_query(db, cursor=cursor, **kwargs).statement
+            yield f"export[{label}]", export_query(db.get_bind(), ["id", "status"], **kwargs)
+
+    yield "count[total]", select(func.count()).select_from(models.Ticket)
+    yield "count[status]", (
+        select(func.count())
+        .select_from(models.Ticket)
+        .where(models.Ticket.status == TicketStatus.NEW)
+    )
+    yield "stats[grouped]", grouped_counts_query()
+
+def explain(conn: Connection, statement) -> List[str]:
+    """Return the plan detail lines for a statement"""
+    with _explain(conn):
+        result = conn.execute(statement)
+    # Read the raw DBAPI rows: the result's column processors expect the query's columns
+    try:
+        return [row[-1] for row in result.cursor.fetchall()]
+    finally:
+        result.close()
+
+def check_query_plans(conn: Connection) -> List[str]:
+    """Return a description of every query shape that regressed"""
+    failures = []
+    db = Session(bind=conn)
+    try:
+        for name, statement in iter_query_shapes(db):
+            plan = explain(conn, statement)
+            ranked = bool(_RANKED.search(str(statement.compile(bind=conn))))
+            for detail in plan:
+                if _FULL_SCAN.match(detail) or (_TEMP_SORT in detail and not ranked):
+                    failures.append(f"{name}: {' | '.join(plan)}")
+                    break
+    finally:
+        db.close()
+    return failures
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite://", help="SQLite database to inspect (default: models in memory)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    if args.url == "sqlite://":
+        # In-memory database: check the index set declared on the models
+        Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        install_search_index(conn)
+        if args.verbose:
+            for name, statement in iter_query_shapes(Session(bind=conn)):
+                print(f"{name}: {' | '.join(explain(conn, statement))}")
+        failures = check_query_plans(conn)
+
+    for failure in failures:
+        print(f"FULL SCAN  {failure}")
+    print(f"{len(failures)} regressed query shape(s)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
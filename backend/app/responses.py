@@ -0,0 +1,79 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__} to msgpack")
+
+class MsgPackResponse(Response):
+    """Binary alternative to JSON for clients that send Accept: application/msgpack"""
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+def _accepted(header: str) -> list[tuple[str, float]]:
+    """(media range, q) pairs of an Accept header; malformed q-values count as 0"""
+    ranges = []
+    for item in header.split(","):
+        media_range, *params = [part.strip() for part in item.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range.lower(), q))
+    return ranges
+
+def _quality(ranges: list[tuple[str, float]], media_type: str) -> float:
+    """q-value of `media_type` from its most specific matching range (RFC 9110 12.5.1)"""
+    main_type = media_type.split("/")[0]
+    for candidate in (media_type, f"{main_type}/*", "*/*"):
+        matches = [q for media_range, q in ranges if media_range == candidate]
+        if matches:
+            return max(matches)
+    return 0.0
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client named msgpack with q > 0, at least as preferred as JSON"""
+    # Wildcards alone never select msgpack: `Accept: */*` keeps getting JSON
+    header = request.headers.get("accept")
+    if msgpack is None or not header:
+        return False
+    ranges = _accepted(header)
+    msgpack_q = max((q for media_range, q in ranges if media_range in MSGPACK_TYPES), default=0.0)
+    return msgpack_q > 0 and msgpack_q >= _quality(ranges, "application/json")
+
+def representation_etag(request: Request, etag: Optional[str]) -> Optional[str]:
+    """ETag of the representation sent to this client: msgpack bodies get their own"""
+    if etag and wants_msgpack(request):
+        return f'{etag[:-1]}-msgpack"'
+    return etag
+
+def negotiated_response(request: Request, content: Any, headers: dict[str, str]) -> Response:
+    """msgpack when the client accepts it, otherwise JSON encoded by orjson"""
+    headers = {**headers, "Vary": "Accept"}
+    if "ETag" in headers:
+        headers["ETag"] = representation_etag(request, headers["ETag"])
+    if wants_msgpack(request):
+        return MsgPackResponse(content, headers=headers)
+    return ORJSONResponse(content, headers=headers)
@@ -1,42 +1,59 @@
-﻿import subprocess
-import sys
+import argparse
+import multiprocessing
 import os
+import sys
+
+# Run from anywhere: make the `app` package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, else one worker per CPU (at most 8)"""
+    return int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 8)))
+
+def check_read_cache(workers: int) -> None:
+    """Refuse READ_CACHE=memory with several workers: it only sees its own process's writes"""
+    # Workers derive the READ_CACHE default from it: "off" with more than one (see app.config)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if workers > 1 and os.getenv("READ_CACHE", "").lower() == "memory":
+        sys.exit(
+            f"READ_CACHE=memory cannot be shared by {workers} workers: "
+            "use READ_CACHE=redis, READ_CACHE=off or --workers 1"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Support Service API launcher")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--reload", action="store_true", help="Development mode: one worker, restart on code changes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    import uvicorn
 
-def check_dependencies():
-    """Check if all dependencies are installed"""
-    try:
-        import fastapi
-        import uvicorn
-        import sqlalchemy
-        import pydantic
-        print("✓ All dependencies are installed")
-        return True
-    except ImportError as e:
-        print(f"✗ Missing dependency: {e}")
-        print("Installing dependencies from requirements.txt...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        return True
-
-def main():
     print("=== Support Service API ===")
-    print("Checking dependencies...")
-    
-    if not check_dependencies():
-        print("Failed to install dependencies")
+    print(f"API Documentation: http://127.0.0.1:{args.port}/docs")
+
+    if args.reload:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
         return
-    
-    print("\nStarting server...")
-    print("API Documentation: http://127.0.0.1:8000/docs")
-    print("Press Ctrl+C to stop\n")
-    
-    # Start the server
-    subprocess.run([
-        sys.executable, "-m", "uvicorn",
+
+    # Before app.config is imported: it reads WEB_CONCURRENCY and READ_CACHE
+    check_read_cache(args.workers)
+
+    # Schema setup once here instead of racing in every worker's startup
+    from app.main import prepare_database
+    prepare_database()
+    os.environ["SCHEMA_SETUP"] = "false"
+
+    print(f"Starting {args.workers} worker(s), press Ctrl+C to stop\n")
+    uvicorn.run(
         "app.main:app",
-        "--reload",
-        "--host", "0.0.0.0",
-        "--port", "8000"
-    ])
+        host=args.host,
+        port=args.port,
+        workers=args.workers
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,3 +1,21 @@
-from app.schemas.ticket import TicketBase, TicketCreate, TicketUpdate, TicketOut
+from app.schemas.ticket import (
+    TicketBase,
+    TicketCreate,
+    TicketUpdate,
+    TicketOut,
+    TicketSummary,
+    TicketBulkUpdate,
+    BulkItemResult,
+    normalize_user_id
+)
 
-__all__ = ["TicketBase", "TicketCreate", "TicketUpdate", "TicketOut"]
\ No newline at end of file
+__all__ = [
+    "TicketBase",
+    "TicketCreate",
+    "TicketUpdate",
+    "TicketOut",
+    "TicketSummary",
+    "TicketBulkUpdate",
+    "BulkItemResult",
+    "normalize_user_id"
+]
\ No newline at end of file
@@ -1,8 +1,20 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional, Union
 from datetime import datetime
 from app.enums import TicketStatus, TicketType, TicketPriority
 
+# Prefix the bot used to put in front of Telegram ids ("user_12345")
+USER_ID_PREFIX = "user_"
+
+def normalize_user_id(user_id: Union[str, int, None]) -> Optional[str]:
+    """Canonical form of a user id: 'user_12345', ' 12345' and 12345 -> '12345'"""
+    if user_id is None:
+        return None
+    value = str(user_id).strip()
+    if value.lower().startswith(USER_ID_PREFIX):
+        value = value[len(USER_ID_PREFIX):]
+    return value or None
+
 class TicketBase(BaseModel):
     """Base schema for ticket"""
     full_name: str = Field(..., min_length=2, max_length=255)
@@ -13,7 +25,12 @@ class TicketBase(BaseModel):
 
 class TicketCreate(TicketBase):
     """Schema for creating a ticket"""
-    pass
+    user_id: Optional[str] = Field(None, max_length=255)
+    
+    @field_validator("user_id", mode="before")
+    @classmethod
+    def _normalize_user_id(cls, value):
+        return normalize_user_id(value)
 
 class TicketUpdate(BaseModel):
     """Schema for updating a ticket"""
@@ -25,10 +42,34 @@ class TicketUpdate(BaseModel):
 class TicketOut(TicketBase):
     """Schema for outputting a ticket"""
     id: int
+    user_id: Optional[str] = None
     status: TicketStatus
     admin_comment: Optional[str]
     assigned_to: Optional[str]
     created_at: datetime
     updated_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TicketSummary(BaseModel):
+    """Compact ticket for list views (GET /tickets/?fields=summary)"""
+    id: int
+    type: TicketType
+    status: TicketStatus
+    priority: TicketPriority
+    full_name: str
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class TicketBulkUpdate(TicketUpdate):
+    """Schema for one item of a bulk update"""
+    id: int
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item of a bulk request, in request order"""
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    ticket: Optional[TicketOut] = None
+    error: Optional[str] = None
@@ -0,0 +1,98 @@
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# External-content FTS5 index over tickets(full_name, text, contact).
+# rowid mirrors tickets.id; triggers keep it in sync inside each write.
+FTS_TABLE = "tickets_fts"
+fts_table = table(FTS_TABLE, column("rowid"))
+
+_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        full_name, text, contact,
+        content='tickets', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, full_name, text, contact)
+        VALUES (new.id, new.full_name, new.text, new.contact);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name, text, contact)
+        VALUES ('delete', old.id, old.full_name, old.text, old.contact);
+    END
+    """,
+    # Only fires when a searchable column is written, so status changes skip it
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF full_name, text, contact ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name, text, contact)
+        VALUES ('delete', old.id, old.full_name, old.text, old.contact);
+        INSERT INTO {FTS_TABLE}(rowid, full_name, text, contact)
+        VALUES (new.id, new.full_name, new.text, new.contact);
+    END
+    """,
+]
+
+# Set once install_search_index() has created (or found) the index
+_fts_installed = False
+
+def install_search_index(conn: Connection) -> bool:
+    """Create the FTS5 table and triggers if missing; backfill a new index.
+
+    Returns False (and leaves ILIKE search in place) when the backend is not
+    SQLite, FTS is disabled in settings, or SQLite was built without FTS5.
+    """
+    global _fts_installed
+    if settings.search_backend != "fts" or conn.dialect.name != "sqlite":
+        return False
+
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first()
+    try:
+        for statement in _DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        conn.commit()
+    except OperationalError as e:
+        conn.rollback()
+        logger.warning(f"FTS5 unavailable, falling back to ILIKE search: {e}")
+        return False
+
+    _fts_installed = True
+    return True
+
+def fts_enabled(bind) -> bool:
+    """Whether search on this engine/connection goes through the FTS index"""
+    return _fts_installed and bind.dialect.name == "sqlite"
+
+def match_expression(term: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def match_clause(expression: str):
+    """WHERE condition selecting rows of fts_table that match `expression`"""
+    return literal_column(FTS_TABLE).op("MATCH")(expression)
+
+def rank_column():
+    """bm25 relevance of the current FTS row (lower is better)"""
+    return func.bm25(literal_column(FTS_TABLE))
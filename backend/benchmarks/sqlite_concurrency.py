@@ -0,0 +1,112 @@
+"""Read/write concurrency of the SQLite storage profiles.
+
+Seeds a fresh database per profile, then runs reader threads (filtered list
+pages) next to writer threads (status updates) for a fixed time and reports
+throughput, read latency and "database is locked" failures.
+
+    cd backend && python -m benchmarks.sqlite_concurrency --readers 8 --writers 2
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base, create_db_engine
+from app.enums import TicketStatus, TicketType, TicketPriority
+
+def seed(Session, count: int) -> None:
+    with Session() as db:
+        for i in range(count):
+            crud.create_ticket(db, schemas.TicketCreate(
+                full_name=f"User {i}",
+                contact=f"user{i}@example.com",
+                type=random.choice(list(TicketType)),
+                text=f"Benchmark ticket number {i} " * 4,
+                priority=random.choice(list(TicketPriority))
+            ))
+
+def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        seed(Session, args.tickets)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {"reads": 0, "writes": 0, "locked": 0, "read_ms": []}
+
+        def reader():
+            with Session() as db:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        crud.get_tickets(db, limit=20, status=random.choice(list(TicketStatus)))
+                        db.rollback()
+                    except OperationalError:
+                        db.rollback()
+                        with lock:
+                            result["locked"] += 1
+                        continue
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        result["reads"] += 1
+                        result["read_ms"].append(elapsed)
+
+        def writer():
+            with Session() as db:
+                while not stop.is_set():
+                    update = schemas.TicketUpdate(status=random.choice(list(TicketStatus)))
+                    try:
+                        crud.update_ticket(db, random.randint(1, args.tickets), update)
+                    except OperationalError:
+                        db.rollback()
+                        with lock:
+                            result["locked"] += 1
+                        continue
+                    with lock:
+                        result["writes"] += 1
+
+        threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+        threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default="default,wal")
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>10}{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'locked':>8}")
+    for profile in args.profiles.split(","):
+        r = run_profile(profile, args)
+        latencies = sorted(r["read_ms"]) or [0.0]
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(
+            f"{profile:<10}"
+            f"{r['reads'] / args.seconds:>10.0f}"
+            f"{r['writes'] / args.seconds:>10.0f}"
+            f"{statistics.median(latencies):>9.2f}"
+            f"{p95:>9.2f}"
+            f"{r['locked']:>8}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start time of the API.
+
+Starts a fresh interpreter per run and measures, against a temporary
+SQLite database: importing app.main, the lifespan startup (schema work)
+and the first request. "existing" starts on a database created by an
+earlier start; "migrated" additionally has an alembic_version table, so
+create_all is skipped.
+
+    cd backend && python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Executed in the child interpreter; prints the phase timings as JSON
+_PROBE = """
+import json, time
+from fastapi.testclient import TestClient  # harness only, not timed
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/tickets/?limit=20")
+    served = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - imported,
+    "first_request": served - ready,
+}))
+"""
+
+PHASES = ("import", "startup", "first_request")
+
+def probe(database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_scenario(name: str, runs: int, fresh: bool, migrated: bool = False) -> None:
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "startup.db"
+        if not fresh:
+            probe(f"sqlite:///{path}")  # create the schema once
+            if migrated:
+                with sqlite3.connect(path) as conn:
+                    conn.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+        for i in range(runs):
+            if fresh:
+                path = Path(tmp) / f"startup{i}.db"
+            samples.append(probe(f"sqlite:///{path}"))
+
+    medians = {phase: statistics.median(s[phase] for s in samples) * 1000 for phase in PHASES}
+    total = sum(medians.values())
+    print(f"{name:<10}" + "".join(f"{medians[phase]:>15.1f}" for phase in PHASES) + f"{total:>10.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"median ms over {args.runs} runs")
+    print(f"{'database':<10}" + "".join(f"{phase:>15}" for phase in PHASES) + f"{'total':>10}")
+    run_scenario("empty", args.runs, fresh=True)
+    run_scenario("existing", args.runs, fresh=False)
+    run_scenario("migrated", args.runs, fresh=False, migrated=True)
+
+if __name__ == "__main__":
+    main()
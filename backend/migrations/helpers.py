@@ -0,0 +1,77 @@
+"""Operations for changing large tables without long write locks.
+
+PostgreSQL builds indexes with CREATE INDEX CONCURRENTLY outside the
+migration transaction; data backfills run in short, separately committed
+batches. On SQLite the same calls fall back to plain statements.
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+BATCH_SIZE = 1000
+
+def _offline() -> bool:
+    """--sql mode: there is no database to inspect, so assume a fresh one"""
+    return op.get_context().as_sql
+
+def has_table(table: str) -> bool:
+    return not _offline() and sa.inspect(op.get_bind()).has_table(table)
+
+def has_column(table: str, column: str) -> bool:
+    return not _offline() and any(
+        c["name"] == column for c in sa.inspect(op.get_bind()).get_columns(table)
+    )
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+def create_index_online(name: str, table: str, columns: Sequence[str]) -> None:
+    """Create an index without blocking writes to `table` (PostgreSQL)"""
+    if not _is_postgresql():
+        op.create_index(name, table, list(columns), if_not_exists=True)
+        return
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        invalid = not _offline() and op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": name}).first()
+        if invalid:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        op.create_index(
+            name, table, list(columns),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+def drop_index_online(name: str, table: str) -> None:
+    """Drop an index without blocking writes to `table` (PostgreSQL)"""
+    if not _is_postgresql():
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+def backfill_in_batches(table: str, assignment: str, where: str, batch_size: int = BATCH_SIZE) -> int:
+    """UPDATE `table` SET `assignment` WHERE `where`, `batch_size` rows per commit
+
+    `where` must stop matching a row once it is updated, or the loop never ends.
+    Each batch locks only its own rows for one short transaction.
+    Returns the number of rows updated.
+    """
+    statement = sa.text(
+        f"UPDATE {table} SET {assignment} "
+        f"WHERE id IN (SELECT id FROM {table} WHERE {where} LIMIT :batch_size)"
+    )
+    if _offline():
+        op.execute(f"UPDATE {table} SET {assignment} WHERE {where}")
+        return 0
+    total = 0
+    with op.get_context().autocommit_block():
+        while True:
+            updated = op.get_bind().execute(statement, {"batch_size": batch_size}).rowcount
+            total += updated
+            if updated < batch_size:
+                return total
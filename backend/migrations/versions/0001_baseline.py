@@ -0,0 +1,49 @@
+"""Baseline: tickets table as created by the original models
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Databases created by create_all before migrations existed already have it
+    if has_table("tickets"):
+        return
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("contact", sa.String(255), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum("QUESTION", "COMPLAINT", "SUGGESTION", name="tickettype", native_enum=False),
+            nullable=False
+        ),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("NEW", "IN_PROGRESS", "RESOLVED", "CLOSED", name="ticketstatus", native_enum=False)
+        ),
+        sa.Column("admin_comment", sa.Text()),
+        sa.Column(
+            "priority",
+            sa.Enum("LOW", "MEDIUM", "HIGH", name="ticketpriority", native_enum=False)
+        ),
+        sa.Column("assigned_to", sa.String(255)),
+    )
+    op.create_index("ix_tickets_id", "tickets", ["id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_id", table_name="tickets")
+    op.drop_table("tickets")
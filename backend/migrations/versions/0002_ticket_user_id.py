@@ -0,0 +1,25 @@
+"""Add tickets.user_id (replaces add_user_id_column.py)
+
+Revision ID: 0002_ticket_user_id
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_column
+
+revision = "0002_ticket_user_id"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # The old script may already have added it. A nullable column without a
+    # default is a catalog-only change, so no rows are rewritten
+    if not has_column("tickets", "user_id"):
+        op.add_column("tickets", sa.Column("user_id", sa.String(255), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("user_id")
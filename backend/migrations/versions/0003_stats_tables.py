@@ -0,0 +1,48 @@
+"""Add ticket_counters and table_versions
+
+Revision ID: 0003_stats_tables
+Revises: 0002_ticket_user_id
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+revision = "0003_stats_tables"
+down_revision = "0002_ticket_user_id"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Filled at startup (rebuild_counters) and by writes, so no backfill here
+    if not has_table("ticket_counters"):
+        op.create_table(
+            "ticket_counters",
+            sa.Column(
+                "status",
+                sa.Enum("NEW", "IN_PROGRESS", "RESOLVED", "CLOSED", name="ticketstatus", native_enum=False),
+                primary_key=True
+            ),
+            sa.Column(
+                "type",
+                sa.Enum("QUESTION", "COMPLAINT", "SUGGESTION", name="tickettype", native_enum=False),
+                primary_key=True
+            ),
+            sa.Column(
+                "priority",
+                sa.Enum("LOW", "MEDIUM", "HIGH", name="ticketpriority", native_enum=False),
+                primary_key=True
+            ),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+    if not has_table("table_versions"):
+        op.create_table(
+            "table_versions",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
+    op.drop_table("ticket_counters")
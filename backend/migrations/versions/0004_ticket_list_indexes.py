@@ -0,0 +1,32 @@
+"""Backfill legacy NULL status/priority and build the list/stats indexes online
+
+Revision ID: 0004_ticket_list_indexes
+Revises: 0003_stats_tables
+Create Date: 2026-10-17
+"""
+from migrations.helpers import backfill_in_batches, create_index_online, drop_index_online
+
+revision = "0004_ticket_list_indexes"
+down_revision = "0003_stats_tables"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_tickets_created_at_id": ["created_at", "id"],
+    "ix_tickets_status_created_at": ["status", "created_at", "id"],
+    "ix_tickets_type_created_at": ["type", "created_at", "id"],
+    "ix_tickets_priority_created_at": ["priority", "created_at", "id"],
+    "ix_tickets_status_priority_type": ["status", "priority", "type"],
+}
+
+def upgrade() -> None:
+    # Rows from before the column defaults: give them the values the API reports
+    backfill_in_batches("tickets", "status = 'NEW'", "status IS NULL")
+    backfill_in_batches("tickets", "priority = 'MEDIUM'", "priority IS NULL")
+
+    for name, columns in INDEXES.items():
+        create_index_online(name, "tickets", columns)
+
+def downgrade() -> None:
+    for name in reversed(list(INDEXES)):
+        drop_index_online(name, "tickets")
@@ -0,0 +1,28 @@
+"""Normalize tickets.user_id and index it for per-user lookups
+
+Revision ID: 0005_ticket_user_id_index
+Revises: 0004_ticket_list_indexes
+Create Date: 2026-10-17
+"""
+from migrations.helpers import backfill_in_batches, create_index_online, drop_index_online
+
+revision = "0005_ticket_user_id_index"
+down_revision = "0004_ticket_list_indexes"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_tickets_user_id_created_at"
+
+def upgrade() -> None:
+    # Same canonical form as schemas.normalize_user_id: "user_12345" -> "12345"
+    backfill_in_batches(
+        "tickets",
+        "user_id = substr(user_id, 6)",
+        "lower(user_id) LIKE 'user\\_%' ESCAPE '\\'"
+    )
+    backfill_in_batches("tickets", "user_id = NULL", "user_id = ''")
+
+    create_index_online(INDEX, "tickets", ["user_id", "created_at", "id"])
+
+def downgrade() -> None:
+    drop_index_online(INDEX, "tickets")
@@ -0,0 +1,31 @@
+"""Add idempotency_keys for POST /tickets/ replays
+
+Revision ID: 0006_idempotency_keys
+Revises: 0005_ticket_user_id_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+revision = "0006_idempotency_keys"
+down_revision = "0005_ticket_user_id_index"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # New table: nothing reads it yet, so a plain CREATE INDEX is fine here
+    if not has_table("idempotency_keys"):
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("key", sa.String(255), primary_key=True),
+            sa.Column("ticket_id", sa.Integer(), nullable=False),
+            sa.Column("fingerprint", sa.String(32), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
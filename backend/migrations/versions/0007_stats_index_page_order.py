@@ -0,0 +1,24 @@
+"""Extend the stats index with (created_at, id) so three-filter lists need no sort
+
+Revision ID: 0007_stats_index_page_order
+Revises: 0006_idempotency_keys
+Create Date: 2026-10-17
+"""
+from migrations.helpers import create_index_online, drop_index_online
+
+revision = "0007_stats_index_page_order"
+down_revision = "0006_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = ("ix_tickets_status_priority_type", ["status", "priority", "type"])
+NEW_INDEX = ("ix_tickets_status_priority_type_created_at", ["status", "priority", "type", "created_at", "id"])
+
+def upgrade() -> None:
+    # Build the replacement first so /tickets/stats never runs without an index
+    create_index_online(NEW_INDEX[0], "tickets", NEW_INDEX[1])
+    drop_index_online(OLD_INDEX[0], "tickets")
+
+def downgrade() -> None:
+    create_index_online(OLD_INDEX[0], "tickets", OLD_INDEX[1])
+    drop_index_online(NEW_INDEX[0], "tickets")
@@ -0,0 +1,59 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+from app.enums import TicketStatus, TicketType, TicketPriority
+from app.query_plans import check_query_plans
+from app.search import install_search_index
+
+@pytest.fixture
+def conn(tmp_path):
+    """File database with the models' schema, the FTS index and a few thousand analyzed tickets"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        assert install_search_index(conn), "SQLite build without FTS5"
+        start = datetime(2024, 1, 1)
+        combos = itertools.cycle(itertools.product(TicketStatus, TicketType, TicketPriority))
+        with Session(bind=conn) as db:
+            db.add_all(
+                models.Ticket(
+                    user_id=str(i % 50),
+                    full_name=f"User {i}",
+                    contact=f"user{i}@example.com",
+                    type=type_,
+                    text=f"ticket {i} about the {'printer' if i % 7 == 0 else 'network'}",
+                    priority=priority,
+                    status=status,
+                    created_at=start + timedelta(minutes=i)
+                )
+                for i, (status, type_, priority) in zip(range(3000), combos)
+            )
+            db.commit()
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+        yield conn
+    engine.dispose()
+
+def test_no_query_shape_scans_or_sorts(conn):
+    assert check_query_plans(conn) == []
+
+def test_missing_index_is_reported(conn):
+    conn.execute(text("DROP INDEX ix_tickets_created_at_id"))
+    failures = check_query_plans(conn)
+    assert any(failure.startswith("list[unfiltered]:") for failure in failures)
+    assert any(failure.startswith("list[unfiltered] cursor:") for failure in failures)
+
+def test_only_bm25_ranked_search_may_sort(conn):
+    conn.execute(text("DROP INDEX ix_tickets_created_at_id"))
+    failures = check_query_plans(conn)
+    # Newest-first search pages and exports must not sort every match
+    assert any(failure.startswith("list[search] cursor:") for failure in failures)
+    assert any(failure.startswith("export[search]:") for failure in failures)
+    # Relevance-ordered search sorts by bm25 whatever the indexes are
+    assert not any(failure.startswith("list[search]:") for failure in failures)
@@ -0,0 +1,128 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.cache import CachedResponse, ReadCache
+from app.cache.redis import RedisBackend
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client calls RedisBackend makes"""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.down = False
+        self.closed = False
+
+    def _check(self):
+        if self.down:
+            raise RedisConnectionError("Connection refused")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self._check()
+        self.data[key] = value
+        self.ttls[key] = px
+
+    async def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key):
+        self._check()
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def aclose(self):
+        self.closed = True
+
+def make_cache(client, ttl=30):
+    return ReadCache(RedisBackend(client, ttl, prefix="test:"))
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_entries_round_trip_with_prefix_and_ttl():
+    client = FakeRedis()
+    cache = make_cache(client, ttl=2.5)
+    entry = CachedResponse({"id": 1}, {"ETag": '"abc"'})
+
+    async def scenario():
+        key = cache.ticket_key(1)
+        assert await cache.lookup(key) == (None, 0)
+        await cache.store(key, entry, 0)
+        return await cache.lookup(key)
+
+    cached, token = run(scenario())
+    assert cached == entry and cached.etag == '"abc"'
+    assert token == 0
+    assert client.ttls["test:ticket:1"] == 2500
+    assert cache.hits["ticket"] == 1 and cache.misses["ticket"] == 1
+
+def test_write_in_one_worker_retires_lists_and_ticket_in_another():
+    client = FakeRedis()
+    reader, writer = make_cache(client), make_cache(client)
+    listing = CachedResponse([{"id": 1}], {"ETag": '"v1"'})
+    ticket = CachedResponse({"id": 1}, {"ETag": '"t1"'})
+
+    async def scenario():
+        list_key = await reader.list_key(("NEW", None, 20))
+        _, token = await reader.lookup(list_key)
+        await reader.store(list_key, listing, token)
+        await reader.store(reader.ticket_key(1), ticket, token)
+        assert (await reader.lookup(list_key))[0] == listing
+
+        await writer.invalidate(1)
+
+        new_list_key = await reader.list_key(("NEW", None, 20))
+        return list_key, new_list_key, await reader.lookup(new_list_key), await reader.lookup(reader.ticket_key(1))
+
+    old_key, new_key, (cached_list, _), (cached_ticket, _) = run(scenario())
+    assert new_key != old_key
+    assert cached_list is None
+    assert cached_ticket is None
+    assert "test:ticket:1" not in client.data
+
+def test_entry_loaded_during_a_write_is_not_stored():
+    client = FakeRedis()
+    cache = make_cache(client)
+
+    async def scenario():
+        key = await cache.stats_key()
+        _, token = await cache.lookup(key)
+        await cache.invalidate()
+        await cache.store(key, CachedResponse({"total": 1}), token)
+
+    run(scenario())
+    assert not any(key.startswith("test:stats:") for key in client.data)
+
+def test_unreachable_redis_makes_every_read_a_miss_and_stores_nothing():
+    client = FakeRedis()
+    client.down = True
+    backend = RedisBackend(client, 30, prefix="test:")
+    cache = ReadCache(backend)
+
+    async def scenario():
+        assert await backend.get_counter("gen:tickets") is None
+        key = await cache.list_key(("NEW",))
+        first = await cache.lookup(key)
+        await cache.store(key, CachedResponse([]), first[1])
+        second = await cache.lookup(key)
+        await cache.invalidate(1)
+        return first, second
+
+    first, second = run(scenario())
+    assert first == (None, None) and second == (None, None)
+    assert client.data == {}
+    assert cache.misses["tickets"] == 2 and not cache.hits
+    assert backend.errors > 0
+    assert cache.info()["errors"] == backend.errors
+
+def test_close_closes_the_client():
+    client = FakeRedis()
+    run(make_cache(client).close())
+    assert client.closed
@@ -0,0 +1,38 @@
+import importlib.util
+
+import pytest
+from starlette.requests import Request
+
+from app.http_cache import not_modified
+from app.responses import representation_etag, wants_msgpack
+
+needs_msgpack = pytest.mark.skipif(importlib.util.find_spec("msgpack") is None, reason="msgpack is not installed")
+
+def request_with(accept=None):
+    headers = [(b"accept", accept.encode())] if accept is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("*/*", False),
+    ("application/json", False),
+    pytest.param("application/msgpack", True, marks=needs_msgpack),
+    pytest.param("application/x-msgpack", True, marks=needs_msgpack),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack; q=0.0, application/json", False),
+    ("application/json, application/msgpack;q=0.5", False),
+    pytest.param("application/msgpack, application/json;q=0.9", True, marks=needs_msgpack),
+    pytest.param("application/msgpack;q=0.3, */*;q=0.1", True, marks=needs_msgpack),
+    ("application/msgpack;q=bogus", False),
+])
+def test_wants_msgpack_honours_q_values(accept, expected):
+    assert wants_msgpack(request_with(accept)) is expected
+
+@needs_msgpack
+def test_msgpack_and_json_bodies_have_different_etags():
+    etag = 'W/"abc"'
+    assert representation_etag(request_with("application/json"), etag) == etag
+    assert representation_etag(request_with("application/msgpack"), etag) == 'W/"abc-msgpack"'
+
+def test_not_modified_varies_on_accept():
+    assert not_modified('W/"abc"').headers["vary"] == "Accept"
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.crud.stats import adjust_counter
+from app.database import Base
+from app.enums import TicketStatus, TicketType, TicketPriority
+
+def test_adjust_counter_upserts_one_row_per_key(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "stats_counters", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}")
+    Base.metadata.create_all(bind=engine)
+    key = (TicketStatus.NEW, TicketType.QUESTION, TicketPriority.HIGH)
+
+    with Session(engine) as db:
+        adjust_counter(db, *key, 1)
+        adjust_counter(db, *key, 2)
+        adjust_counter(db, TicketStatus.CLOSED, TicketType.QUESTION, TicketPriority.HIGH, 1)
+        adjust_counter(db, *key, -1)
+        db.commit()
+        counts = {
+            (row.status, row.type, row.priority): row.count
+            for row in db.scalars(select(models.TicketCounter))
+        }
+
+    assert counts == {key: 2, (TicketStatus.CLOSED, TicketType.QUESTION, TicketPriority.HIGH): 1}
+    engine.dispose()
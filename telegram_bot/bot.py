@@ -9,7 +9,7 @@ from aiogram.types import BotCommand, BotCommandScopeDefault, Message, CallbackQ
 from redis.asyncio import Redis
 
 from config import config
-from database import init_db, close_db  # Измененный импорт!
+from database import init_db, close_db
 from middleware import LoggingMiddleware, DependenciesMiddleware
 from handlers.user import register_user_handlers
 from handlers.admin import register_admin_handlers
@@ -19,6 +19,7 @@ from keyboards.main import get_main_menu
 from services.notifications import NotificationService
 from services.analytics import AnalyticsService
 from services.api_client import APIClient
+from services.outbox import OutboxWorker
 from utils.logger import setup_logging
 
 # Настройка логирования
@@ -44,15 +45,18 @@ async def on_startup(bot: Bot, dp: Dispatcher):
     # Инициализация сервисов
     analytics_service = AnalyticsService()
     api_client = APIClient()
-    notification_service = NotificationService(bot=bot)
+    await api_client.open()  # один пул соединений к API на все время работы
+    notification_service = NotificationService(bot=bot, api_client=api_client)
+    outbox_worker = OutboxWorker(api_client, notification_service)
     
     # Добавляем сервисы в workflow_data диспетчера для доступа в middleware
     dp.workflow_data["analytics_service"] = analytics_service
     dp.workflow_data["api_client"] = api_client
     dp.workflow_data["notification_service"] = notification_service
+    dp.workflow_data["outbox_worker"] = outbox_worker
     
     # Инициализация базы данных
-    init_db()  # Теперь это не асинхронная функция!
+    await init_db()
     
     # Установка команд бота
     await set_bot_commands(bot)
@@ -60,6 +64,9 @@ async def on_startup(bot: Bot, dp: Dispatcher):
     # Запуск службы уведомлений
     await notification_service.start()
     
+    # Фоновая отправка обращений, сохраненных без связи с API
+    await outbox_worker.start()
+    
     # Отправка уведомления админам
     for admin_id in config.bot.admin_ids:
         try:
@@ -84,9 +91,15 @@ async def on_shutdown(bot: Bot, dp: Dispatcher):
         
         if "analytics_service" in dp.workflow_data:
             await dp.workflow_data["analytics_service"].shutdown()
+        
+        if "outbox_worker" in dp.workflow_data:
+            await dp.workflow_data["outbox_worker"].shutdown()
+        
+        if "api_client" in dp.workflow_data:
+            await dp.workflow_data["api_client"].close()
     
     # Закрываем соединение с БД
-    close_db()  # Используем правильную функцию
+    await close_db()
     
     await bot.session.close()
 
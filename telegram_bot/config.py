@@ -12,6 +12,10 @@ class DatabaseConfig:
     name: str = os.getenv("DB_NAME", "support.db")  # support.db для SQLite
     user: str = os.getenv("DB_USER", "")
     password: str = os.getenv("DB_PASSWORD", "")
+    
+    # Групповой коммит локальной БД бота: до N записей или M мс на транзакцию
+    batch_max_rows: int = int(os.getenv("DB_BATCH_SIZE", 100))
+    batch_max_delay_ms: float = float(os.getenv("DB_BATCH_DELAY_MS", 5))
 
 @dataclass
 class RedisConfig:
@@ -26,6 +30,27 @@ class APIConfig:
     timeout: int = 30
     max_retries: int = 3
     api_key: Optional[str] = os.getenv("API_KEY")
+    
+    # Пул соединений долгоживущего HTTP-клиента
+    max_connections: int = int(os.getenv("API_MAX_CONNECTIONS", 20))
+    max_keepalive_connections: int = int(os.getenv("API_MAX_KEEPALIVE", 10))
+    keepalive_expiry: float = float(os.getenv("API_KEEPALIVE_EXPIRY", 30))
+    http2: bool = os.getenv("API_HTTP2", "False").lower() == "true"  # нужен пакет h2
+    
+    # Устойчивость: общий дедлайн вызова, выключатель и бюджет повторов
+    deadline: float = float(os.getenv("API_DEADLINE", 5))
+    breaker_failure_threshold: int = int(os.getenv("API_BREAKER_THRESHOLD", 5))
+    breaker_reset_timeout: float = float(os.getenv("API_BREAKER_RESET", 30))
+    retry_budget_ratio: float = float(os.getenv("API_RETRY_BUDGET", 0.2))
+
+@dataclass
+class OutboxConfig:
+    """Фоновая отправка обращений, сохраненных локально"""
+    batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", 20))
+    concurrency: int = int(os.getenv("OUTBOX_CONCURRENCY", 4))
+    interval: float = float(os.getenv("OUTBOX_INTERVAL", 10))  # секунд между проходами
+    backoff_max: float = float(os.getenv("OUTBOX_BACKOFF_MAX", 600))
+    max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 50))
 
 @dataclass
 class BotConfig:
@@ -62,6 +87,7 @@ class Config:
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     redis: RedisConfig = field(default_factory=RedisConfig)
     api: APIConfig = field(default_factory=APIConfig)
+    outbox: OutboxConfig = field(default_factory=OutboxConfig)
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     environment: str = os.getenv("ENVIRONMENT", "development")
 
@@ -1,37 +1,204 @@
-# database.py - простая версия для SQLite
+# database.py - асинхронная версия для SQLite (aiosqlite)
+import asyncio
+import itertools
 import sqlite3
 import logging
+import time
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+
+import aiosqlite
+
+from config import config
 
 logger = logging.getLogger(__name__)
 
+# За сколько последних секунд считать сэкономленные коммиты в секунду
+BATCH_STATS_WINDOW = 60
+
+# Состояния отправки обращения в API (колонка user_tickets.sync_state)
+SYNC_PENDING = "pending"  # ждет отправки в outbox
+SYNC_DONE = "synced"  # отправлено, ticket_id получен
+SYNC_FAILED = "failed"  # попытки исчерпаны, нужна ручная проверка
+
+# Колонки outbox, добавляемые в существующие базы
+OUTBOX_COLUMNS = {
+    "sync_state": f"TEXT DEFAULT '{SYNC_DONE}'",
+    "idempotency_key": "TEXT",
+    "sync_attempts": "INTEGER DEFAULT 0",
+    "next_attempt_at": "TIMESTAMP",
+    "last_error": "TEXT",
+}
+
+class WriteBatcher:
+    """Групповой коммит: записи копятся до `max_rows` штук или `max_delay`
+    секунд и фиксируются одной транзакцией
+
+    Вызывающий ждет коммита своей записи, поэтому гарантии те же, что у
+    отдельного коммита, а fsync один на пачку. Если пачка падает, записи
+    повторяются по одной: ошибка достается только своему вызывающему.
+    """
+    
+    def __init__(self, database: "Database", max_rows: int = 100, max_delay: float = 0.005):
+        self.database = database
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending: List[Tuple[str, tuple, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._flushes: set = set()
+        self.writes = 0
+        self.commits = 0
+        # [секунда, сэкономлено коммитов] за последние BATCH_STATS_WINDOW секунд
+        self._saved: deque = deque()
+    
+    async def execute(self, sql: str, params: tuple = ()) -> None:
+        """Поставить запись в пачку и дождаться ее коммита"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sql, params, future))
+        if len(self._pending) >= self.max_rows:
+            self._flush_soon()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush_soon)
+        await future
+    
+    def _flush_soon(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+    
+    async def flush(self) -> None:
+        """Зафиксировать все накопленные записи"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.max_rows]
+                del self._pending[:self.max_rows]
+                await self._commit_batch(batch)
+    
+    async def _commit_batch(self, batch: list) -> None:
+        """Зафиксировать пачку; каждый вызывающий получает результат или ошибку"""
+        try:
+            conn = await self.database._db()
+            try:
+                # Подряд идущие одинаковые запросы - одним executemany
+                for sql, group in itertools.groupby(batch, key=lambda item: item[0]):
+                    await conn.executemany(sql, [params for _, params, _ in group])
+                await conn.commit()
+            except Exception as e:
+                logger.warning(f"Batch of {len(batch)} writes failed, retrying one by one: {e}")
+                await conn.rollback()
+                await self._commit_each(conn, batch)
+                return
+            self._record(len(batch), 1)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        except Exception as e:
+            # БД недоступна или не удался откат: ошибку получают все, кто еще ждет
+            logger.error(f"Batch of {len(batch)} writes failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Отмена посреди коммита: ожидающие не должны зависнуть
+            for _, _, future in batch:
+                if not future.done():
+                    future.cancel()
+    
+    async def _commit_each(self, conn: aiosqlite.Connection, batch: list) -> None:
+        for sql, params, future in batch:
+            try:
+                await conn.execute(sql, params)
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+        self._record(len(batch), len(batch))
+    
+    def _record(self, writes: int, commits: int) -> None:
+        self.writes += writes
+        self.commits += commits
+        second = int(time.monotonic())
+        if self._saved and self._saved[-1][0] == second:
+            self._saved[-1][1] += writes - commits
+        else:
+            self._saved.append([second, writes - commits])
+    
+    def stats(self) -> Dict[str, Any]:
+        """Сколько записей прошло и сколько коммитов сэкономлено"""
+        horizon = int(time.monotonic()) - BATCH_STATS_WINDOW
+        while self._saved and self._saved[0][0] <= horizon:
+            self._saved.popleft()
+        return {
+            "writes": self.writes,
+            "commits": self.commits,
+            "commits_saved": self.writes - self.commits,
+            "commits_saved_per_sec": round(sum(saved for _, saved in self._saved) / BATCH_STATS_WINDOW, 2),
+        }
+    
+    async def close(self) -> None:
+        """Дописать все, что еще в очереди"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
 class Database:
-    """Класс для работы с локальной SQLite базой данных бота"""
+    """Класс для работы с локальной SQLite базой данных бота
+    
+    Все запросы выполняются в отдельном потоке aiosqlite, поэтому диск
+    (в том числе fsync при коммите) не блокирует цикл событий aiogram.
+    """
     
     def __init__(self, db_path: str = "telegram_bot.db"):
         self.db_path = Path(db_path)
-        self.conn: Optional[sqlite3.Connection] = None
-        self._init_db()
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # Все записи идут через групповой коммит
+        self.batcher = WriteBatcher(
+            self,
+            max_rows=config.database.batch_max_rows,
+            max_delay=config.database.batch_max_delay_ms / 1000
+        )
     
-    def _init_db(self) -> None:
-        """Инициализация базы данных"""
-        try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-            self._create_tables()
-            logger.info(f"✅ Локальная БД инициализирована: {self.db_path}")
-        except Exception as e:
-            logger.error(f"❌ Ошибка инициализации БД: {e}")
-            raise
+    async def connect(self) -> None:
+        """Открытие соединения и создание таблиц (один раз)"""
+        async with self._connect_lock:
+            if self.conn is not None:
+                return
+            try:
+                conn = await aiosqlite.connect(self.db_path)
+                conn.row_factory = sqlite3.Row
+                # WAL: коммит без полного fsync базы, чтение не ждет запись
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await self._create_tables(conn)
+                self.conn = conn
+                logger.info(f"✅ Локальная БД инициализирована: {self.db_path}")
+            except Exception as e:
+                logger.error(f"❌ Ошибка инициализации БД: {e}")
+                raise
     
-    def _create_tables(self) -> None:
+    async def _db(self) -> aiosqlite.Connection:
+        """Соединение; открывается при первом обращении, если connect() не вызывали"""
+        if self.conn is None:
+            await self.connect()
+        return self.conn
+    
+    async def _create_tables(self, conn: aiosqlite.Connection) -> None:
         """Создание таблиц"""
-        cursor = self.conn.cursor()
-        
         # Таблица для обращений пользователей
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS user_tickets (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 telegram_id INTEGER NOT NULL,
@@ -47,7 +214,7 @@ class Database:
         """)
         
         # Таблица для пользователей бота
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS bot_users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 telegram_id INTEGER UNIQUE NOT NULL,
@@ -59,22 +226,46 @@ class Database:
             )
         """)
         
+        await self._add_outbox_columns(conn)
+        
         # Индексы для быстрого поиска
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tickets_telegram_id ON user_tickets(telegram_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tickets_created_at ON user_tickets(created_at DESC)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bot_users_telegram_id ON bot_users(telegram_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_user_tickets_telegram_id ON user_tickets(telegram_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_user_tickets_created_at ON user_tickets(created_at DESC)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_bot_users_telegram_id ON bot_users(telegram_id)")
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_user_tickets_outbox "
+            "ON user_tickets(sync_state, next_attempt_at)"
+        )
+        await conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_user_tickets_idempotency_key "
+            "ON user_tickets(idempotency_key)"
+        )
         
-        self.conn.commit()
+        await conn.commit()
     
-    def save_user_ticket(self, telegram_id: int, ticket_data: dict) -> bool:
+    async def _add_outbox_columns(self, conn: aiosqlite.Connection) -> None:
+        """Добавление колонок outbox в таблицу, созданную до их появления"""
+        async with conn.execute("PRAGMA table_info(user_tickets)") as cursor:
+            existing = {row["name"] for row in await cursor.fetchall()}
+        missing = [name for name in OUTBOX_COLUMNS if name not in existing]
+        for name in missing:
+            await conn.execute(f"ALTER TABLE user_tickets ADD COLUMN {name} {OUTBOX_COLUMNS[name]}")
+        
+        if "sync_state" in missing:
+            # Обращения, сохраненные без ticket_id до появления outbox, отправляем заново
+            await conn.execute(f"""
+                UPDATE user_tickets
+                SET sync_state = '{SYNC_PENDING}', idempotency_key = lower(hex(randomblob(16)))
+                WHERE ticket_id IS NULL
+            """)
+    
+    async def save_user_ticket(self, telegram_id: int, ticket_data: dict) -> bool:
         """Сохранение обращения пользователя"""
         try:
-            cursor = self.conn.cursor()
-            
             # Получаем текущее время
             created_at = datetime.now().isoformat()
             
-            cursor.execute("""
+            await self.batcher.execute("""
                 INSERT INTO user_tickets 
                 (telegram_id, ticket_id, full_name, contact, type, text, priority, status, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -89,20 +280,185 @@ class Database:
                 ticket_data.get('status', 'NEW'),
                 created_at
             ))
-            
-            self.conn.commit()
             return True
             
         except Exception as e:
             logger.error(f"Error saving user ticket: {e}")
             return False
     
-    def get_user_tickets(self, telegram_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    async def enqueue_user_ticket(
+        self,
+        telegram_id: int,
+        ticket_data: dict,
+        delay: float = 0
+    ) -> Optional[Dict[str, Any]]:
+        """Сохранение обращения в outbox до отправки в API
+
+        Возвращает строку (id, idempotency_key, ...) для OutboxWorker.
+        `delay` откладывает фоновую отправку, пока идет первая попытка.
+        Повтор с тем же ticket_data['idempotency_key'] (двойное нажатие)
+        возвращает уже сохраненную строку.
+        """
+        try:
+            conn = await self._db()
+            now = datetime.now()
+            key = ticket_data.get('idempotency_key') or uuid.uuid4().hex
+            await self.batcher.execute("""
+                INSERT OR IGNORE INTO user_tickets 
+                (telegram_id, full_name, contact, type, text, priority, status, created_at,
+                 sync_state, idempotency_key, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                telegram_id,
+                ticket_data.get('full_name', ''),
+                ticket_data.get('contact', ''),
+                ticket_data.get('type', ''),
+                ticket_data.get('text', ''),
+                ticket_data.get('priority', 'MEDIUM'),
+                ticket_data.get('status', 'NEW'),
+                now.isoformat(),
+                SYNC_PENDING,
+                key,
+                (now + timedelta(seconds=delay)).isoformat()
+            ))
+            async with conn.execute("SELECT * FROM user_tickets WHERE idempotency_key = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+            return dict(row) if row else None
+            
+        except Exception as e:
+            logger.error(f"Error enqueueing user ticket: {e}")
+            return None
+    
+    async def get_pending_tickets(
+        self,
+        limit: int = 20,
+        telegram_id: Optional[int] = None,
+        ignore_schedule: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Обращения из outbox, которые пора отправить (старые первыми; всех или одного пользователя)
+
+        ignore_schedule=True - все ожидающие, даже если пауза перед
+        следующей попыткой еще не прошла (ручная отправка).
+        """
+        query = "SELECT * FROM user_tickets WHERE sync_state = ?"
+        params: list = [SYNC_PENDING]
+        if not ignore_schedule:
+            query += " AND (next_attempt_at IS NULL OR next_attempt_at <= ?)"
+            params.append(datetime.now().isoformat())
+        if telegram_id is not None:
+            query += " AND telegram_id = ?"
+            params.append(telegram_id)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        try:
+            conn = await self._db()
+            async with conn.execute(query, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+            
+        except Exception as e:
+            logger.error(f"Error getting pending tickets: {e}")
+            return []
+    
+    async def mark_ticket_synced(self, row_id: int, ticket_id: int, status: str = 'NEW') -> bool:
+        """Записать настоящий ticket_id после успешной отправки"""
+        try:
+            await self.batcher.execute("""
+                UPDATE user_tickets
+                SET ticket_id = ?, status = ?, sync_state = ?, last_error = NULL, next_attempt_at = NULL
+                WHERE id = ?
+            """, (ticket_id, status, SYNC_DONE, row_id))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error marking ticket synced: {e}")
+            return False
+    
+    async def mark_ticket_retry(
+        self,
+        row_id: int,
+        error: str,
+        next_attempt_at: Optional[datetime],
+        failed: bool = False,
+        counted: bool = True
+    ) -> bool:
+        """Отложить следующую попытку (или пометить обращение как failed)
+
+        counted=False - запрос не отправлялся (выключатель открыт, нет
+        соединения), и sync_attempts не увеличивается.
+        """
+        try:
+            await self.batcher.execute("""
+                UPDATE user_tickets
+                SET sync_attempts = sync_attempts + ?, last_error = ?, next_attempt_at = ?, sync_state = ?
+                WHERE id = ?
+            """, (
+                int(counted),
+                error[:500],
+                next_attempt_at.isoformat() if next_attempt_at else None,
+                SYNC_FAILED if failed else SYNC_PENDING,
+                row_id
+            ))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error scheduling ticket retry: {e}")
+            return False
+    
+    async def requeue_failed_tickets(self, telegram_id: Optional[int] = None) -> bool:
+        """Вернуть в очередь обращения со статусом failed (всех или одного
+        пользователя); счетчик попыток обнуляется, last_error сохраняется"""
+        query = """
+            UPDATE user_tickets
+            SET sync_state = ?, sync_attempts = 0, next_attempt_at = NULL
+            WHERE sync_state = ?
+        """
+        params: list = [SYNC_PENDING, SYNC_FAILED]
+        if telegram_id is not None:
+            query += " AND telegram_id = ?"
+            params.append(telegram_id)
+        try:
+            await self.batcher.execute(query, tuple(params))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error requeueing failed tickets: {e}")
+            return False
+    
+    async def count_pending_tickets(self, telegram_id: Optional[int] = None, state: str = SYNC_PENDING) -> int:
+        """Сколько обращений ждут отправки (всего или у одного пользователя);
+        state=SYNC_FAILED - сколько не удалось отправить"""
+        query = "SELECT COUNT(*) FROM user_tickets WHERE sync_state = ?"
+        params: list = [state]
+        if telegram_id is not None:
+            query += " AND telegram_id = ?"
+            params.append(telegram_id)
+        try:
+            conn = await self._db()
+            async with conn.execute(query, params) as cursor:
+                return (await cursor.fetchone())[0]
+        except Exception as e:
+            logger.error(f"Error counting pending tickets: {e}")
+            return 0
+    
+    async def update_ticket_status(self, ticket_id: int, status: str) -> bool:
+        """Обновление статуса локальной копии обращения (по номеру в системе)"""
+        try:
+            await self.batcher.execute(
+                "UPDATE user_tickets SET status = ? WHERE ticket_id = ?",
+                (status, ticket_id)
+            )
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error updating local ticket status: {e}")
+            return False
+    
+    async def get_user_tickets(self, telegram_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Получение обращений пользователя"""
         try:
-            cursor = self.conn.cursor()
+            conn = await self._db()
             
-            cursor.execute("""
+            async with conn.execute("""
                 SELECT 
                     ticket_id, 
                     full_name, 
@@ -111,76 +467,77 @@ class Database:
                     text, 
                     priority, 
                     status, 
+                    sync_state,
                     datetime(created_at) as created_at
                 FROM user_tickets 
                 WHERE telegram_id = ?
                 ORDER BY created_at DESC
                 LIMIT ?
-            """, (telegram_id, limit))
-            
-            tickets = cursor.fetchall()
+            """, (telegram_id, limit)) as cursor:
+                tickets = await cursor.fetchall()
             return [dict(ticket) for ticket in tickets]
             
         except Exception as e:
             logger.error(f"Error getting user tickets: {e}")
             return []
     
-    def update_user(self, telegram_id: int, username: str = None, 
-                   first_name: str = None, last_name: str = None) -> bool:
+    async def update_user(self, telegram_id: int, username: str = None,
+                         first_name: str = None, last_name: str = None) -> bool:
         """Обновление информации о пользователе"""
         try:
-            cursor = self.conn.cursor()
-            
-            # Проверяем, есть ли пользователь
-            cursor.execute("SELECT id FROM bot_users WHERE telegram_id = ?", (telegram_id,))
-            user_exists = cursor.fetchone()
-            
-            if user_exists:
-                # Обновляем существующего
-                cursor.execute("""
-                    UPDATE bot_users 
-                    SET username = ?, first_name = ?, last_name = ?, last_activity = CURRENT_TIMESTAMP
-                    WHERE telegram_id = ?
-                """, (username, first_name, last_name, telegram_id))
-            else:
-                # Добавляем нового
-                cursor.execute("""
-                    INSERT INTO bot_users (telegram_id, username, first_name, last_name)
-                    VALUES (?, ?, ?, ?)
-                """, (telegram_id, username, first_name, last_name))
-            
-            self.conn.commit()
+            # Один UPSERT вместо SELECT и UPDATE/INSERT
+            await self.batcher.execute("""
+                INSERT INTO bot_users (telegram_id, username, first_name, last_name)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(telegram_id) DO UPDATE SET
+                    username = excluded.username,
+                    first_name = excluded.first_name,
+                    last_name = excluded.last_name,
+                    last_activity = CURRENT_TIMESTAMP
+            """, (telegram_id, username, first_name, last_name))
             return True
             
         except Exception as e:
             logger.error(f"Error updating user: {e}")
             return False
     
-    def close(self) -> None:
-        """Закрытие соединения"""
+    async def close(self) -> None:
+        """Закрытие соединения (после записи очереди группового коммита)"""
         if self.conn:
-            self.conn.close()
+            await self.batcher.close()
+            logger.info(f"Групповой коммит: {self.batcher.stats()}")
+            await self.conn.close()
             self.conn = None
             logger.info("✅ Соединение с БД закрыто")
 
-# Создаем глобальный экземпляр
+# Создаем глобальный экземпляр (соединение открывает init_db)
 db_instance = Database()
 
 # Функции для удобного доступа
-def save_user_ticket(telegram_id: int, ticket_data: dict) -> bool:
-    return db_instance.save_user_ticket(telegram_id, ticket_data)
+async def save_user_ticket(telegram_id: int, ticket_data: dict) -> bool:
+    return await db_instance.save_user_ticket(telegram_id, ticket_data)
+
+async def get_user_tickets(telegram_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    return await db_instance.get_user_tickets(telegram_id, limit)
+
+async def enqueue_user_ticket(telegram_id: int, ticket_data: dict, delay: float = 0) -> Optional[Dict[str, Any]]:
+    return await db_instance.enqueue_user_ticket(telegram_id, ticket_data, delay)
+
+async def count_pending_tickets(telegram_id: Optional[int] = None, state: str = SYNC_PENDING) -> int:
+    return await db_instance.count_pending_tickets(telegram_id, state)
 
-def get_user_tickets(telegram_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    return db_instance.get_user_tickets(telegram_id, limit)
+async def requeue_failed_tickets(telegram_id: Optional[int] = None) -> bool:
+    return await db_instance.requeue_failed_tickets(telegram_id)
 
-def update_user(telegram_id: int, username: str = None, 
-               first_name: str = None, last_name: str = None) -> bool:
-    return db_instance.update_user(telegram_id, username, first_name, last_name)
+async def update_user(telegram_id: int, username: str = None,
+                     first_name: str = None, last_name: str = None) -> bool:
+    return await db_instance.update_user(telegram_id, username, first_name, last_name)
 
-def close_db() -> None:
+async def close_db() -> None:
     """Функция для закрытия БД"""
-    db_instance.close()
+    await db_instance.close()
 
-def init_db() -> Database:
-    """Функция для инициализации БД (для совместимости)"""
-    return db_instance
\ No newline at end of file
+async def init_db() -> Database:
+    """Функция для инициализации БД (открывает соединение и создает таблицы)"""
+    await db_instance.connect()
+    return db_instance
@@ -5,6 +5,7 @@ from aiogram.types import Message, CallbackQuery, BufferedInputFile, InlineKeybo
 from aiogram.enums import ParseMode
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+import asyncio
 import logging
 import sqlite3
 import csv
@@ -76,54 +77,40 @@ def get_all_tickets_from_db(limit: int = 100, status_filter: str = None):
         logger.error(f"Ошибка при чтении из БД: {e}")
         return []
 
-def update_ticket_status(ticket_id: int, status: str, comment: str = None):
-    """Обновить статус обращения в базе данных"""
-    try:
-        db_path = Path("C:/Users/Admin/OneDrive/Рабочий стол/производственная практика/backend/support.db")
-        
-        if not db_path.exists():
-            logger.error(f"БД не найдена по пути: {db_path}")
-            return False
-        
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        current_time = datetime.now().isoformat()
-        update_data = {
-            'status': status,
-            'updated_at': current_time
-        }
-        
-        # Если есть комментарий, добавляем его
-        if comment:
-            # Проверяем, есть ли уже комментарий
-            cursor.execute("SELECT admin_comment FROM tickets WHERE id = ?", (ticket_id,))
-            existing_comment = cursor.fetchone()
-            
-            if existing_comment and existing_comment[0]:
-                # Добавляем к существующему комментарию с новой строкой
-                new_comment = f"{existing_comment[0]}\n[{current_time[:16]}] {comment}"
-            else:
-                new_comment = f"[{current_time[:16]}] {comment}"
-            
-            update_data['admin_comment'] = new_comment
-            logger.info(f"Добавлен комментарий к обращению #{ticket_id}: {comment}")
+def get_stats_from_db(limit: int = 1000):
+    """Посчитать статистику по обращениям напрямую из базы данных"""
+    tickets = get_all_tickets_from_db(limit=limit)
+    
+    stats = {
+        'total': len(tickets),
+        'statuses': {
+            'NEW': 0,
+            'IN_PROGRESS': 0,
+            'RESOLVED': 0,
+            'CLOSED': 0
+        },
+        'priorities': {
+            'HIGH': 0,
+            'MEDIUM': 0,
+            'LOW': 0
+        },
+        'types': {}
+    }
+    
+    for ticket in tickets:
+        status = ticket.get('status', 'NEW')
+        priority = ticket.get('priority', 'MEDIUM')
+        type_ = ticket.get('type', 'UNKNOWN')
         
-        # Формируем SQL запрос
-        set_clause = ', '.join([f"{key} = ?" for key in update_data.keys()])
-        values = list(update_data.values())
-        values.append(ticket_id)
+        if status in stats['statuses']:
+            stats['statuses'][status] += 1
         
-        cursor.execute(f"UPDATE tickets SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        conn.close()
+        if priority in stats['priorities']:
+            stats['priorities'][priority] += 1
         
-        logger.info(f"Статус обращения #{ticket_id} обновлен на '{status}'")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Ошибка при обновлении статуса обращения #{ticket_id}: {e}")
-        return False
+        stats['types'][type_] = stats['types'].get(type_, 0) + 1
+    
+    return stats
 
 @router.message(Command("admin"))
 @router.message(F.text == "👑 Админ-панель")
@@ -140,7 +127,7 @@ async def cmd_admin(message: Message):
 async def admin_all_tickets(callback: CallbackQuery):
     """Показать все обращения (первая страница)"""
     try:
-        tickets = get_all_tickets_from_db(limit=10)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=10)
         
         if not tickets:
             await callback.message.answer("📭 Обращений нет.")
@@ -181,7 +168,7 @@ async def admin_all_tickets(callback: CallbackQuery):
 async def admin_new_tickets(callback: CallbackQuery):
     """Показать новые обращения (созданные за последние 2 дня)"""
     try:
-        tickets = get_all_tickets_from_db(limit=100)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=100)
         
         if not tickets:
             await callback.message.edit_text("📭 Обращений нет.")
@@ -241,7 +228,7 @@ async def admin_new_tickets(callback: CallbackQuery):
 async def admin_manage_tickets(callback: CallbackQuery):
     """Управление обращениями - выбор обращения"""
     try:
-        tickets = get_all_tickets_from_db(limit=20)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=20)
         
         if not tickets:
             await callback.message.edit_text("📭 Обращений нет.")
@@ -297,7 +284,7 @@ async def manage_single_ticket(callback: CallbackQuery):
         ticket_id = int(callback.data.split(":")[1])
         
         # Получаем информацию о обращении
-        tickets = get_all_tickets_from_db(limit=100)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=100)
         ticket = next((t for t in tickets if t.get('id') == ticket_id), None)
         
         if not ticket:
@@ -348,7 +335,7 @@ async def manage_single_ticket(callback: CallbackQuery):
         await callback.answer("❌ Ошибка при управлении обращением")
 
 @router.callback_query(F.data.startswith("status:"))
-async def change_ticket_status(callback: CallbackQuery):
+async def change_ticket_status(callback: CallbackQuery, api_client: APIClient):
     """Изменить статус обращения"""
     try:
         data_parts = callback.data.split(":")
@@ -359,21 +346,29 @@ async def change_ticket_status(callback: CallbackQuery):
         ticket_id = int(data_parts[1])
         new_status = data_parts[2].upper()
         
-        # Обновляем статус в базе
-        success = update_ticket_status(ticket_id, new_status, f"Статус изменен на {new_status}")
+        ticket = await api_client.get_ticket(ticket_id)
+        if not ticket:
+            await callback.answer("❌ Обращение не найдено")
+            return
+        
+        # Как и раньше, смена статуса дописывается в комментарий с отметкой времени;
+        # assigned_to не меняется
+        note = f"[{datetime.now().isoformat()[:16]}] Статус изменен на {new_status}"
+        existing_comment = ticket.get('admin_comment')
         
-        if success:
+        # Через API: сервер сбрасывает кэши, ETag и счетчики статистики
+        updated = await api_client.update_ticket(ticket_id, {
+            "status": new_status,
+            "admin_comment": f"{existing_comment}\n{note}" if existing_comment else note
+        })
+        
+        if updated:
             # Обновляем локальную БД бота (если такое обращение есть)
             try:
                 # Импортируем здесь, чтобы избежать циклического импорта
                 from database import db_instance
                 # Обновляем статус в локальной БД бота
-                cursor = db_instance.conn.cursor()
-                cursor.execute(
-                    "UPDATE user_tickets SET status = ? WHERE ticket_id = ?",
-                    (new_status, ticket_id)
-                )
-                db_instance.conn.commit()
+                await db_instance.update_ticket_status(ticket_id, new_status)
             except Exception as e:
                 logger.error(f"Error updating local DB: {e}")
             
@@ -399,7 +394,7 @@ async def change_ticket_status(callback: CallbackQuery):
 async def admin_users(callback: CallbackQuery):
     """Показать пользователей"""
     try:
-        tickets = get_all_tickets_from_db(limit=200)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=200)
         
         if not tickets:
             await callback.message.edit_text("👥 Пользователей пока нет.")
@@ -458,7 +453,7 @@ async def admin_export(callback: CallbackQuery, bot: Bot):
     """Экспорт данных"""
     try:
         # Получаем все обращения
-        tickets = get_all_tickets_from_db(limit=500)
+        tickets = await asyncio.to_thread(get_all_tickets_from_db, limit=500)
         
         if not tickets:
             await callback.message.edit_text("📁 Нет данных для экспорта.")
@@ -509,44 +504,21 @@ async def admin_export(callback: CallbackQuery, bot: Bot):
 async def admin_stats(callback: CallbackQuery, api_client: APIClient):
     """Показать статистику"""
     try:
-        # Получаем статистику из базы напрямую
-        tickets = get_all_tickets_from_db(limit=1000)
+        # Агрегированная статистика считается на сервере одним запросом
+        stats = None
+        try:
+            stats = await api_client.get_stats()
+        except Exception as e:
+            logger.error(f"Error getting stats from API: {e}")
         
-        if not tickets:
+        if not stats or 'priorities' not in stats:
+            stats = await asyncio.to_thread(get_stats_from_db)
+        
+        if not stats or not stats.get('total'):
             await callback.message.edit_text("📊 Нет данных для статистики.")
             await callback.answer()
             return
         
-        # Считаем статистику
-        stats = {
-            'total': len(tickets),
-            'statuses': {
-                'NEW': 0,
-                'IN_PROGRESS': 0,
-                'RESOLVED': 0,
-                'CLOSED': 0
-            },
-            'priorities': {
-                'HIGH': 0,
-                'MEDIUM': 0,
-                'LOW': 0
-            },
-            'types': {}
-        }
-        
-        for ticket in tickets:
-            status = ticket.get('status', 'NEW')
-            priority = ticket.get('priority', 'MEDIUM')
-            type_ = ticket.get('type', 'UNKNOWN')
-            
-            if status in stats['statuses']:
-                stats['statuses'][status] += 1
-            
-            if priority in stats['priorities']:
-                stats['priorities'][priority] += 1
-            
-            stats['types'][type_] = stats['types'].get(type_, 0) + 1
-        
         # Формируем отчет
         report = (
             "📊 <b>РАСШИРЕННАЯ СТАТИСТИКА</b>\n\n"
@@ -569,6 +541,25 @@ async def admin_stats(callback: CallbackQuery, api_client: APIClient):
         for type_name, count in stats['types'].items():
             report += f"📋 {type_name}: {count}\n"
         
+        # Сколько одинаковых одновременных GET-запросов к API было объединено
+        flights = api_client.coalescing_stats()
+        circuit = api_client.health()["circuit"]
+        report += (
+            "\n<b>Запросы к API:</b>\n"
+            f"📡 Отправлено: {flights['requests']}\n"
+            f"🔗 Объединено: {flights['coalesced']}\n"
+            f"🔌 Выключатель: {circuit['state']} (отклонено {circuit['rejected']})\n"
+        )
+        
+        # Групповой коммит локальной БД бота
+        from database import db_instance
+        writes = db_instance.batcher.stats()
+        report += (
+            "\n<b>Локальная БД:</b>\n"
+            f"💾 Записей: {writes['writes']}, коммитов: {writes['commits']}\n"
+            f"⚡ Сэкономлено коммитов: {writes['commits_saved_per_sec']}/с\n"
+        )
+        
         await callback.message.edit_text(
             report,
             parse_mode=ParseMode.HTML
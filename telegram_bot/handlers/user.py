@@ -6,6 +6,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.utils.markdown import hbold
 from aiogram.enums import ParseMode
 import logging
+import uuid
 from datetime import datetime
 
 from states.user_states import TicketCreation
@@ -15,8 +16,9 @@ from keyboards.main import (
     get_priority_keyboard
 )
 from services.api_client import APIClient
-from services.notifications import NotificationService
-from database import save_user_ticket, get_user_tickets, update_user  # Правильный импорт!
+from services.outbox import OutboxWorker
+from config import config
+from database import SYNC_FAILED, enqueue_user_ticket, count_pending_tickets, get_user_tickets, requeue_failed_tickets, update_user
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -26,7 +28,7 @@ logger = logging.getLogger(__name__)
 async def cmd_new_ticket(message: Message, state: FSMContext):
     """Начало создания обращения"""
     # Сохраняем информацию о пользователе
-    update_user(
+    await update_user(
         telegram_id=message.from_user.id,
         username=message.from_user.username,
         first_name=message.from_user.first_name,
@@ -90,7 +92,9 @@ async def process_text(message: Message, state: FSMContext):
         await message.answer("❌ Описание должно содержать минимум 10 символов.")
         return
     
-    await state.update_data(text=message.text)
+    # Ключ идемпотентности на всю отправку: двойное нажатие на приоритет
+    # и повторы запроса не создадут второе обращение
+    await state.update_data(text=message.text, idempotency_key=uuid.uuid4().hex)
     await state.set_state(TicketCreation.priority)
     
     await message.answer(
@@ -102,10 +106,9 @@ async def process_text(message: Message, state: FSMContext):
 async def process_priority(
     callback: CallbackQuery,
     state: FSMContext,
-    api_client: APIClient,
-    notification_service: NotificationService
+    outbox_worker: OutboxWorker
 ):
-    """Обработка приоритета"""
+    """Обработка приоритета: обращение сохраняется в outbox и отправляется в API"""
     priority = callback.data.split(":")[1].upper()
     
     # Получаем все данные
@@ -124,100 +127,43 @@ async def process_priority(
     # Показываем прогресс
     progress_msg = await callback.message.answer("⏳ Создаем обращение...")
     
-    try:
-        result = None
-        ticket_id = None
-        
-        # Пробуем отправить в API
-        if hasattr(api_client, 'create_ticket'):
-            try:
-                result = await api_client.create_ticket(ticket_data)
-                if result:
-                    ticket_id = result.get('id')
-                    
-                    # Уведомляем
-                    try:
-                        await notification_service.notify_new_ticket(result)
-                    except Exception as e:
-                        logger.error(f"Error notifying: {e}")
-            except Exception as api_error:
-                logger.error(f"API error: {api_error}")
-        
-        # Сохраняем в локальную БД
-        local_ticket_data = {
-            'id': ticket_id,
-            'full_name': data["full_name"],
-            'contact': data["contact"],
-            'type': data["type"],
-            'text': data["text"],
-            'priority': priority,
-            'status': 'NEW'
-        }
-        
-        saved = save_user_ticket(callback.from_user.id, local_ticket_data)  # Правильный вызов!
-        
-        if saved:
-            status_text = "сохранено локально"
-            if result:
-                status_text = "сохранено в системе"
-            
-            await progress_msg.edit_text(
-                f"✅ {hbold('Обращение создано!')}\n\n"
-                f"📋 <b>Данные обращения:</b>\n"
-                f"🆔 Номер: #{ticket_id if ticket_id else 'Локальное'}\n"
-                f"👤 ФИО: {data['full_name']}\n"
-                f"📞 Контакт: {data['contact']}\n"
-                f"📝 Тип: {data['type']}\n"
-                f"🚨 Приоритет: {priority}\n"
-                f"📊 Статус: НОВЫЙ\n\n"
-                f"Мы свяжемся с вами в ближайшее время!\n"
-                f"<i>Обращение {status_text}.</i>",
-                parse_mode=ParseMode.HTML
-            )
-        else:
-            await progress_msg.edit_text(
-                "❌ Произошла ошибка при сохранении обращения. Попробуйте позже."
-            )
-            
-    except Exception as e:
-        logger.error(f"Error creating ticket: {e}")
-        
-        # Пробуем хотя бы сохранить локально
-        try:
-            local_ticket_data = {
-                'id': None,
-                'full_name': data["full_name"],
-                'contact': data["contact"],
-                'type': data["type"],
-                'text': data["text"],
-                'priority': priority,
-                'status': 'NEW'
-            }
-            
-            saved = save_user_ticket(callback.from_user.id, local_ticket_data)  # Правильный вызов!
-            
-            if saved:
-                await progress_msg.edit_text(
-                    f"⚠️ {hbold('Обращение создано локально!')}\n\n"
-                    f"📋 <b>Данные обращения:</b>\n"
-                    f"👤 ФИО: {data['full_name']}\n"
-                    f"📞 Контакт: {data['contact']}\n"
-                    f"📝 Тип: {data['type']}\n"
-                    f"🚨 Приоритет: {priority}\n"
-                    f"📊 Статус: НОВЫЙ\n\n"
-                    f"Мы свяжемся с вами в ближайшее время!\n"
-                    f"<i>Обращение сохранено локально (API временно недоступен).</i>",
-                    parse_mode=ParseMode.HTML
-                )
-            else:
-                await progress_msg.edit_text(
-                    f"❌ Ошибка при создании обращения: {str(e)}"
-                )
-        except Exception as save_error:
-            logger.error(f"Error saving locally: {save_error}")
-            await progress_msg.edit_text(
-                f"❌ Критическая ошибка: {str(e)}"
-            )
+    # Сначала outbox: обращение не теряется, даже если API недоступен.
+    # Фоновая отправка начнется после первой попытки (дедлайн вызова + 1 с)
+    row = await enqueue_user_ticket(
+        callback.from_user.id,
+        {**ticket_data, 'status': 'NEW', 'idempotency_key': data.get("idempotency_key")},
+        delay=config.api.deadline + 1
+    )
+    if not row:
+        await progress_msg.edit_text(
+            "❌ Произошла ошибка при сохранении обращения. Попробуйте позже."
+        )
+        await state.clear()
+        await callback.answer()
+        return
+    
+    # Первая попытка сразу; при открытом выключателе это занимает миллисекунды
+    # Администраторов уведомляет OutboxWorker, один раз на обращение
+    result = await outbox_worker.submit(row)
+    ticket_id = result.get('id') if result else None
+    
+    status_text = (
+        "сохранено в системе" if result else
+        "сохранено локально и будет отправлено автоматически, как только API станет доступен"
+    )
+    await progress_msg.edit_text(
+        f"✅ {hbold('Обращение создано!')}\n\n"
+        f"📋 <b>Данные обращения:</b>\n"
+        f"🆔 Номер: #{ticket_id if ticket_id else 'Локальное'}\n"
+        f"👤 ФИО: {data['full_name']}\n"
+        f"📞 Контакт: {data['contact']}\n"
+        f"📝 Тип: {data['type']}\n"
+        f"🚨 Приоритет: {priority}\n"
+        f"📊 Статус: НОВЫЙ\n\n"
+        f"Мы свяжемся с вами в ближайшее время!\n"
+        f"<i>Обращение {status_text}.</i>",
+        parse_mode=ParseMode.HTML
+    )
     
     await state.clear()
     await callback.answer()
@@ -232,7 +178,7 @@ async def cmd_my_tickets(message: Message):
     
     try:
         # Получаем обращения из локальной БД
-        tickets = get_user_tickets(user_id, limit=10)  # Правильный вызов!
+        tickets = await get_user_tickets(user_id, limit=10)  # Правильный вызов!
         
         if not tickets:
             await progress_msg.edit_text("📭 У вас пока нет обращений.")
@@ -240,7 +186,7 @@ async def cmd_my_tickets(message: Message):
         
         # Показываем обращения
         for i, ticket in enumerate(tickets[:5], 1):
-            ticket_id = ticket.get('ticket_id', 'Локальное')
+            ticket_id = ticket.get('ticket_id') or 'Локальное'
             ticket_type = ticket.get('type', 'N/A')
             ticket_text = ticket.get('text', '')[:100]
             ticket_status = ticket.get('status', 'N/A')
@@ -287,7 +233,7 @@ async def cmd_all_tickets(message: Message):
     
     try:
         # Получаем все обращения из локальной БД
-        tickets = get_user_tickets(user_id, limit=100)  # Правильный вызов!
+        tickets = await get_user_tickets(user_id, limit=100)  # Правильный вызов!
         
         if not tickets:
             await progress_msg.edit_text("📭 У вас пока нет обращений.")
@@ -295,7 +241,7 @@ async def cmd_all_tickets(message: Message):
         
         # Показываем все обращения
         for i, ticket in enumerate(tickets, 1):
-            ticket_id = ticket.get('ticket_id', 'Локальное')
+            ticket_id = ticket.get('ticket_id') or 'Локальное'
             ticket_type = ticket.get('type', 'N/A')
             ticket_text = ticket.get('text', '')[:100]
             ticket_status = ticket.get('status', 'N/A')
@@ -331,12 +277,33 @@ async def cmd_all_tickets(message: Message):
 # УДАЛЯЕМ неработающие функции:
 
 @router.message(Command("sync_tickets"))
-async def cmd_sync_tickets(message: Message):
-    """Функция временно не работает"""
-    await message.answer(
-        "🔄 Функция синхронизации временно недоступна.\n"
-        "Все ваши обращения сохраняются локально в боте."
-    )
+async def cmd_sync_tickets(message: Message, outbox_worker: OutboxWorker):
+    """Отправить в API обращения, сохраненные локально"""
+    user_id = message.from_user.id
+    # Ручной запуск дает еще один круг попыток и обращениям со статусом failed
+    await requeue_failed_tickets(user_id)
+    if not await count_pending_tickets(user_id):
+        await message.answer("✅ Все ваши обращения уже отправлены в систему.")
+        return
+    
+    progress_msg = await message.answer("🔄 Отправляем сохраненные обращения...")
+    # Только обращения этого пользователя: остальное отправит фоновый цикл
+    sent = await outbox_worker.drain(user_id)
+    pending = await count_pending_tickets(user_id)
+    failed = await count_pending_tickets(user_id, SYNC_FAILED)
+    if failed:
+        await progress_msg.edit_text(
+            f"❌ Отправлено: {sent}. Не удалось отправить: {failed}"
+            + (f", ожидают отправки: {pending}" if pending else "") + ".\n"
+            "Система отклонила обращение. Создайте его заново или свяжитесь с администратором."
+        )
+    elif pending:
+        await progress_msg.edit_text(
+            f"⏳ Отправлено: {sent}. Ожидают отправки: {pending}.\n"
+            "API пока недоступен, бот повторит попытку автоматически."
+        )
+    else:
+        await progress_msg.edit_text("✅ Все ваши обращения отправлены в систему.")
 
 @router.message(Command("stats"))
 @router.message(F.text == "📊 Статистика")
@@ -23,7 +23,7 @@ class DependenciesMiddleware(BaseMiddleware):
         
         if dispatcher and hasattr(dispatcher, 'workflow_data'):
             # Добавляем сервисы из workflow_data диспетчера
-            for key in ['analytics_service', 'api_client', 'notification_service']:
+            for key in ['analytics_service', 'api_client', 'notification_service', 'outbox_worker']:
                 if key in dispatcher.workflow_data:
                     data[key] = dispatcher.workflow_data[key]
         
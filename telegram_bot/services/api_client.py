@@ -1,55 +1,30 @@
 import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any, List
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Awaitable, Callable
 import httpx
 from httpx import AsyncClient, Timeout, HTTPStatusError
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from config import config
+from services.resilience import CircuitBreaker, CircuitOpenError, CircuitState, RetryBudget, remaining
 
 logger = logging.getLogger(__name__)
-async def get_tickets_by_user_id(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
-    """Получение обращений по user_id (работает с любым форматом)"""
-    try:
-        # Пробуем получить все обращения и отфильтровать
-        all_tickets = []
-        skip = 0
-        limit = 100
-        
-        while True:
-            tickets = await self.get_tickets(skip=skip, limit=limit)
-            if not tickets:
-                break
-            
-            # Фильтруем по user_id
-            for ticket in tickets:
-                ticket_user_id = ticket.get('user_id')
-                
-                # Проверяем все возможные форматы
-                if isinstance(ticket_user_id, str):
-                    # Если user_id в формате "user_12345"
-                    if ticket_user_id == f"user_{user_id}":
-                        all_tickets.append(ticket)
-                    # Если user_id это просто число в виде строки
-                    elif ticket_user_id == str(user_id):
-                        all_tickets.append(ticket)
-                elif isinstance(ticket_user_id, int):
-                    # Если user_id это число
-                    if ticket_user_id == int(user_id):
-                        all_tickets.append(ticket)
-            
-            # Если получили меньше лимита, значит это последняя страница
-            if len(tickets) < limit:
-                break
-            
-            skip += limit
-        
-        return all_tickets
-        
-    except Exception as e:
-        logger.error(f"Error getting tickets by user_id {user_id}: {e}")
-        return []
+
+# Сколько GET-ответов с ETag хранить для условных запросов
+ETAG_CACHE_SIZE = 256
+
+# Пауза перед повтором: 0.2, 0.4, 0.8... секунды (со случайным разбросом)
+RETRY_BACKOFF = 0.2
+RETRY_BACKOFF_MAX = 2.0
+
+# Запрос не дошел до сервера: повтор безопасен для любого метода
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
 class APIClient:
     """Умный клиент для работы с API"""
     
@@ -63,45 +38,244 @@ class APIClient:
         
         if config.api.api_key:
             self.headers["Authorization"] = f"Bearer {config.api.api_key}"
+        
+        # (endpoint, params) -> (ETag, тело ответа) для If-None-Match
+        self._etag_cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        
+        # Один клиент на все запросы: соединения (и TLS-сессии) переиспользуются
+        self._client: Optional[AsyncClient] = None
+        
+        # Single-flight: ключ GET-запроса -> выполняющаяся задача
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.flight_calls = 0  # GET-запросов ушло на сервер
+        self.coalesced_calls = 0  # GET-запросов получили чужой результат
+        
+        # Пока API недоступен, запросы отклоняются сразу, без ожидания таймаутов
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.api.breaker_failure_threshold,
+            reset_timeout=config.api.breaker_reset_timeout
+        )
+        self.retry_budget = RetryBudget(ratio=config.api.retry_budget_ratio)
     
     def _create_client(self) -> AsyncClient:
-        """Создание клиента с настройками"""
+        """Создание клиента с настройками пула"""
+        limits = httpx.Limits(
+            max_connections=config.api.max_connections,
+            max_keepalive_connections=config.api.max_keepalive_connections,
+            keepalive_expiry=config.api.keepalive_expiry
+        )
+        http2 = config.api.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("API_HTTP2 включен, но пакет h2 не установлен: используется HTTP/1.1")
+                http2 = False
         return AsyncClient(
             base_url=self.base_url,
             timeout=self.timeout,
             headers=self.headers,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            limits=limits,
+            http2=http2
         )
     
-    @retry(
-        stop=stop_after_attempt(config.api.max_retries),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((httpx.ConnectError, httpx.ReadTimeout)),
-    )
+    async def open(self) -> None:
+        """Открытие пула соединений (вызывается в on_startup)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+    
+    async def close(self) -> None:
+        """Закрытие пула соединений (вызывается в on_shutdown)"""
+        logger.info(f"API single-flight: {self.coalescing_stats()}")
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self) -> "APIClient":
+        await self.open()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    @property
+    def client(self) -> AsyncClient:
+        """Общий клиент; создается при первом обращении, если open() не вызывали"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    async def _send(
+        self, 
+        method: str, 
+        endpoint: str, 
+        raise_client_errors: bool = False,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        """Выполнение запроса с повторными попытками (возвращает сам ответ)
+
+        Вся попытка, включая повторы, укладывается в config.api.deadline.
+        Повторы тратят токены RetryBudget. Ошибки сети и ответы 5xx
+        открывают выключатель, и тогда вызов сразу падает с CircuitOpenError.
+        Ответ 4xx дает None, а с raise_client_errors=True - HTTPStatusError,
+        чтобы вызывающий мог отличить отказ от временной ошибки.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"API unavailable (circuit {self.breaker.state.value})")
+        
+        deadline = time.monotonic() + config.api.deadline
+        idempotent = method in IDEMPOTENT_METHODS or "Idempotency-Key" in (kwargs.get("headers") or {})
+        self.retry_budget.deposit()
+        settled = False
+        attempt = 1
+        try:
+            while True:
+                try:
+                    left = remaining(deadline)
+                    if left is None:
+                        raise httpx.TimeoutException(f"Deadline of {config.api.deadline}s exceeded")
+                    response = await self.client.request(method, endpoint, timeout=left, **kwargs)
+                except httpx.TransportError as e:
+                    self.breaker.record_failure()
+                    settled = True
+                    if not await self._may_retry(idempotent, e, attempt, deadline):
+                        logger.error(f"Request failed: {e!r}")
+                        raise
+                    settled = False
+                    attempt += 1
+                    continue
+                
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                settled = True
+                break
+        finally:
+            if not settled:
+                self.breaker.abandon()  # например, отмена: пробный запрос не состоялся
+        
+        if response.status_code == 304:
+            return response  # Not Modified: тело берется из кэша ETag
+        try:
+            response.raise_for_status()
+        except HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
+            if e.response.status_code == 401 or raise_client_errors:
+                raise
+            return None
+        return response
+    
+    async def _may_retry(self, idempotent: bool, error: Exception, attempt: int, deadline: float) -> bool:
+        """Подождать перед повтором, если он разрешен; False, если повторять нельзя"""
+        if attempt >= config.api.max_retries or self.breaker.state == CircuitState.OPEN:
+            return False
+        # Запрос мог дойти до сервера: без ключа идемпотентности не повторяем
+        if not isinstance(error, CONNECT_ERRORS) and not idempotent:
+            return False
+        delay = min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+        left = remaining(deadline)
+        if left is None or delay >= left or not self.retry_budget.withdraw():
+            return False
+        await asyncio.sleep(delay)
+        return True
+    
+    def health(self) -> Dict[str, Any]:
+        """Состояние выключателя и бюджета повторов"""
+        return {"circuit": self.breaker.info(), "retry_budget": self.retry_budget.info()}
+    
     async def _make_request(
         self, 
         method: str, 
         endpoint: str, 
         **kwargs
     ) -> Optional[Dict[str, Any]]:
-        """Выполнение запроса с повторными попытками"""
-        async with self._create_client() as client:
-            try:
-                response = await client.request(method, endpoint, **kwargs)
-                response.raise_for_status()
-                return response.json() if response.content else None
-            except HTTPStatusError as e:
-                logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-                if e.response.status_code == 401:
-                    raise
+        """Выполнение запроса с повторными попытками
+
+        GET-запросы отправляются с If-None-Match: если данные не изменились,
+        сервер отвечает 304 без тела и возвращается сохраненный ответ.
+        Одновременные одинаковые GET-запросы объединяются (single-flight).
+        """
+        if method != "GET":
+            response = await self._send(method, endpoint, **kwargs)
+            if response is None:
                 return None
-            except Exception as e:
-                logger.error(f"Request failed: {e}")
-                raise
+            return response.json() if response.content else None
+        
+        cache_key = f"{endpoint}?{json.dumps(kwargs.get('params') or {}, sort_keys=True, default=str)}"
+        return await self._single_flight(cache_key, lambda: self._get(cache_key, endpoint, **kwargs))
     
-    async def create_ticket(self, ticket_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Создание обращения"""
-        return await self._make_request("POST", "/tickets/", json=ticket_data)
+    async def _single_flight(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Одновременные одинаковые GET-запросы разделяют один запрос к API
+
+        Первый вызов запускает запрос отдельной задачей, остальные ждут ее
+        результат (или исключение). Отмена одного из ожидающих не отменяет
+        запрос для остальных. Результат общий: его нельзя изменять на месте.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+            return await asyncio.shield(task)
+        
+        task = asyncio.ensure_future(call())
+        self._inflight[key] = task
+        self.flight_calls += 1
+        
+        def forget(_):
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        
+        task.add_done_callback(forget)
+        return await asyncio.shield(task)
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Метрики single-flight: сколько GET-запросов объединено"""
+        total = self.flight_calls + self.coalesced_calls
+        return {
+            "requests": self.flight_calls,
+            "coalesced": self.coalesced_calls,
+            "in_flight": len(self._inflight),
+            "coalesced_ratio": round(self.coalesced_calls / total, 3) if total else 0.0,
+        }
+    
+    async def _get(self, cache_key: str, endpoint: str, **kwargs) -> Optional[Any]:
+        """GET с If-None-Match: при 304 возвращается сохраненный ответ"""
+        cached = self._etag_cache.get(cache_key)
+        if cached:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": cached[0]}
+        
+        response = await self._send("GET", endpoint, **kwargs)
+        if response is None:
+            return None
+        if response.status_code == 304 and cached:
+            self._etag_cache.move_to_end(cache_key)
+            return cached[1]
+        
+        data = response.json() if response.content else None
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[cache_key] = (etag, data)
+            self._etag_cache.move_to_end(cache_key)
+            if len(self._etag_cache) > ETAG_CACHE_SIZE:
+                self._etag_cache.popitem(last=False)
+        return data
+    
+    async def create_ticket(
+        self,
+        ticket_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Создание обращения
+
+        С `idempotency_key` повторная отправка того же обращения (повтор
+        после таймаута, фоновая синхронизация) не создает дубликат. Без него
+        ключ создается на этот вызов, чтобы хотя бы его повторы были безопасны.
+        Если API отклонил обращение (4xx), поднимается HTTPStatusError.
+        """
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return await self._make_request(
+            "POST", "/tickets/", json=ticket_data, headers=headers, raise_client_errors=True
+        )
     
     async def get_tickets(
         self, 
@@ -121,6 +295,40 @@ class APIClient:
         result = await self._make_request("GET", "/tickets/", params=params)
         return result if result else []
     
+    async def get_tickets_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        endpoint: str = "/tickets/"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Страница обращений по курсору: (обращения, курсор следующей страницы)"""
+        params = {"limit": min(limit, 100)}
+        if cursor:
+            params["cursor"] = cursor
+        if filters:
+            params.update(filters)
+        
+        response = await self._send("GET", endpoint, params=params)
+        if response is None:
+            return [], None
+        return response.json() or [], response.headers.get("X-Next-Cursor")
+    
+    async def iter_tickets(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = 100,
+        endpoint: str = "/tickets/"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Обход всех обращений постранично (keyset-пагинация, без OFFSET)"""
+        cursor = None
+        while True:
+            tickets, cursor = await self.get_tickets_page(cursor, page_size, filters, endpoint)
+            for ticket in tickets:
+                yield ticket
+            if not cursor:
+                break
+    
     async def get_ticket(self, ticket_id: int) -> Optional[Dict[str, Any]]:
         """Получение обращения по ID"""
         return await self._make_request("GET", f"/tickets/{ticket_id}")
@@ -154,6 +362,33 @@ class APIClient:
         }
         return await self.update_ticket(ticket_id, update_data)
     
+    async def create_tickets_bulk(
+        self, 
+        tickets: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Создание нескольких обращений одним запросом (одна транзакция)"""
+        return await self._make_request("POST", "/tickets/bulk", json=tickets)
+    
+    async def update_tickets_bulk(
+        self, 
+        updates: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Обновление нескольких обращений одним запросом (каждый элемент содержит id)"""
+        return await self._make_request("PATCH", "/tickets/bulk", json=updates)
+    
+    async def change_status_bulk(
+        self, 
+        ticket_ids: List[int], 
+        status: str, 
+        user_id: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Массовое изменение статуса (например, закрыть все решенные)"""
+        updates = [
+            {"id": ticket_id, "status": status, "assigned_to": f"telegram_{user_id}"}
+            for ticket_id in ticket_ids
+        ]
+        return await self.update_tickets_bulk(updates)
+    
     async def get_stats(self) -> Optional[Dict[str, Any]]:
         """Получение статистики"""
         return await self._make_request("GET", "/tickets/stats")
@@ -162,59 +397,35 @@ class APIClient:
         """Поиск обращений по любому полю"""
         return await self._make_request("GET", "/tickets/", params={"search": query})
     
-    # ВАЖНО: Обновленный метод для поиска обращений пользователя
-    async def get_user_tickets(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
-        """Получение обращений конкретного пользователя"""
-        # Сначала пробуем поиск по user_id в формате "user_12345"
-        user_tickets = []
-        
+    async def get_user_tickets(
+        self,
+        user_id: int,
+        limit: Optional[int] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Обращения конкретного пользователя, новые первыми
+
+        Страницы по 100 обходятся по X-Next-Cursor, пока не наберется
+        `limit` обращений (без `limit` - все).
+        """
+        page_size = min(limit, 100) if limit else 100
+        tickets = []
         try:
-            # Пробуем разные форматы поиска
-            search_formats = [
-                f"user_{user_id}",  # формат "user_12345"
-                str(user_id),        # просто число
-            ]
-            
-            for search_query in search_formats:
-                try:
-                    result = await self.search_tickets(search_query)
-                    if result:
-                        # Фильтруем только обращения этого пользователя
-                        for ticket in result:
-                            ticket_user_id = ticket.get('user_id')
-                            if isinstance(ticket_user_id, str) and ticket_user_id == f"user_{user_id}":
-                                user_tickets.append(ticket)
-                            elif isinstance(ticket_user_id, int) and ticket_user_id == user_id:
-                                user_tickets.append(ticket)
-                            elif str(ticket_user_id) == str(user_id):
-                                user_tickets.append(ticket)
-                        
-                        # Если нашли обращения, выходим
-                        if user_tickets:
-                            break
-                except Exception as e:
-                    logger.error(f"Error searching with query {search_query}: {e}")
-                    continue
-            
-            # Если не нашли через поиск, получаем все обращения и фильтруем
-            if not user_tickets:
-                all_tickets = await self.get_tickets(limit=500)  # Получаем все доступные
-                if all_tickets:
-                    for ticket in all_tickets:
-                        ticket_user_id = ticket.get('user_id')
-                        if isinstance(ticket_user_id, str) and ticket_user_id == f"user_{user_id}":
-                            user_tickets.append(ticket)
-                        elif isinstance(ticket_user_id, int) and ticket_user_id == user_id:
-                            user_tickets.append(ticket)
-                        elif str(ticket_user_id) == str(user_id):
-                            user_tickets.append(ticket)
-            
-            return user_tickets if user_tickets else []
-            
+            async for ticket in self.iter_tickets(page_size=page_size, endpoint=f"/users/{user_id}/tickets"):
+                tickets.append(ticket)
+                if limit and len(tickets) >= limit:
+                    break
+            return tickets
         except Exception as e:
             logger.error(f"Error getting user tickets: {e}")
             return []
     
+    async def get_tickets_by_user_id(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Обращения по user_id в любом формате ("user_12345" или "12345")
+
+        Нормализацию префикса выполняет сервер.
+        """
+        return await self.get_user_tickets(user_id)
+    
     async def upload_attachment(
         self, 
         ticket_id: int, 
@@ -24,9 +24,9 @@ class Notification:
 class NotificationService:
     """Сервис умных уведомлений"""
     
-    def __init__(self, bot: Bot):
+    def __init__(self, bot: Bot, api_client: Optional[APIClient] = None):
         self.bot = bot
-        self.api_client = APIClient()
+        self.api_client = api_client or APIClient()
         self.queue = asyncio.Queue()
         self.is_running = False
     
@@ -0,0 +1,182 @@
+# services/outbox.py
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config import config
+from database import SYNC_FAILED, db_instance
+from services.api_client import CONNECT_ERRORS, APIClient
+from services.resilience import CircuitOpenError
+from services.notifications import NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Поля обращения, которые уходят в API
+TICKET_FIELDS = ("full_name", "contact", "type", "text", "priority")
+
+# Ответы 4xx, после которых повтор имеет смысл; остальные - окончательный отказ
+RETRYABLE_STATUSES = {401, 403, 408, 409, 425, 429}
+
+class OutboxWorker:
+    """Фоновая отправка обращений из локального outbox в API
+
+    Обращение сначала сохраняется в user_tickets (sync_state='pending'),
+    затем отправляется с Idempotency-Key. Неудачные попытки откладываются
+    с экспоненциальной паузой; повторная отправка не создает дубликатов.
+    """
+
+    def __init__(
+        self,
+        api_client: APIClient,
+        notification_service: Optional[NotificationService] = None
+    ):
+        self.api_client = api_client
+        self.notification_service = notification_service
+        self.batch_size = config.outbox.batch_size
+        self.interval = config.outbox.interval
+        self._semaphore = asyncio.Semaphore(config.outbox.concurrency)
+        self._wakeup = asyncio.Event()
+        self._in_flight: Dict[int, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.synced = 0
+        self.failed_attempts = 0
+
+    async def start(self) -> None:
+        """Запуск фонового цикла"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """Остановка цикла; неотправленное остается в outbox до следующего запуска"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info(f"Outbox worker shutdown: synced={self.synced}, pending={await db_instance.count_pending_tickets()}")
+
+    def wake(self) -> None:
+        """Запустить проход, не дожидаясь интервала"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self, telegram_id: Optional[int] = None) -> int:
+        """Отправить все обращения, которым пора (или только обращения одного
+        пользователя - тогда без учета паузы между попытками); возвращает
+        число отправленных"""
+        sent = 0
+        while True:
+            rows = [
+                row for row in await db_instance.get_pending_tickets(
+                    self.batch_size, telegram_id, ignore_schedule=telegram_id is not None
+                )
+                if row["id"] not in self._in_flight
+            ]
+            if not rows:
+                return sent
+            results = await asyncio.gather(*(self.submit(row) for row in rows))
+            sent += sum(1 for result in results if result)
+            if not all(results):
+                # API снова недоступен: остальное подождет следующего прохода
+                return sent
+
+    async def submit(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Одна попытка отправить строку outbox; при успехе записывает ticket_id
+
+        Если строка уже отправляется (двойное нажатие, фоновый проход),
+        ожидается та же попытка.
+        """
+        if row.get("ticket_id"):
+            return {"id": row["ticket_id"], "status": row.get("status", "NEW")}
+        task = self._in_flight.get(row["id"])
+        if task is None:
+            task = asyncio.ensure_future(self._submit(row))
+            self._in_flight[row["id"]] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(row["id"], None))
+        return await asyncio.shield(task)
+
+    async def _submit(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            ticket_data = {name: row[name] for name in TICKET_FIELDS}
+            ticket_data["user_id"] = f"user_{row['telegram_id']}"
+            sent, rejected = True, False
+            try:
+                result = await self.api_client.create_ticket(ticket_data, row["idempotency_key"])
+                error = None if result else "API returned no ticket"
+            except (CircuitOpenError, *CONNECT_ERRORS) as e:
+                # Запрос не ушел из бота: попытка не засчитывается
+                result, error, sent = None, f"{type(e).__name__}: {e}", False
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                result, error = None, f"HTTP {status}: {e.response.text}"
+                # Повтор с тем же телом и ключом получит тот же отказ
+                rejected = status not in RETRYABLE_STATUSES
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+
+        if rejected:
+            logger.error(f"Outbox ticket {row['id']} rejected by API: {error}")
+            self.failed_attempts += 1
+            await db_instance.mark_ticket_retry(row["id"], error, None, failed=True)
+            return None
+
+        if not result or not result.get("id"):
+            await self._schedule_retry(row, error or "API returned no ticket id", counted=sent)
+            return None
+
+        await db_instance.mark_ticket_synced(row["id"], result["id"], result.get("status", "NEW"))
+        self.synced += 1
+        await self._notify_synced(row, result)
+        return result
+
+    async def _schedule_retry(self, row: Dict[str, Any], error: str, counted: bool = True) -> None:
+        """Отложить строку; в лимит OUTBOX_MAX_ATTEMPTS идут только попытки,
+        при которых запрос действительно отправлялся"""
+        attempts = (row.get("sync_attempts") or 0) + counted
+        self.failed_attempts += 1
+        if attempts >= config.outbox.max_attempts:
+            logger.error(f"Outbox ticket {row['id']} failed after {attempts} attempts: {error}")
+            await db_instance.mark_ticket_retry(row["id"], error, None, failed=True)
+            return
+        delay = min(2 ** max(attempts, 1), config.outbox.backoff_max) * random.uniform(0.5, 1.0)
+        await db_instance.mark_ticket_retry(
+            row["id"], error, datetime.now() + timedelta(seconds=delay), counted=counted
+        )
+
+    async def _notify_synced(self, row: Dict[str, Any], ticket: Dict[str, Any]) -> None:
+        """Админам - о каждом отправленном обращении (ровно один раз);
+        пользователю - если обращение дошло до системы не сразу"""
+        if self.notification_service is None:
+            return
+        await self.notification_service.notify_new_ticket(ticket)
+        if not row.get("last_error"):
+            return
+        await self.notification_service.send_immediate(
+            row["telegram_id"],
+            f"✅ Ваше обращение зарегистрировано в системе под номером <b>#{ticket['id']}</b>."
+        )
+
+    async def info(self) -> Dict[str, Any]:
+        return {
+            "pending": await db_instance.count_pending_tickets(),
+            "failed": await db_instance.count_pending_tickets(state=SYNC_FAILED),
+            "synced": self.synced,
+            "failed_attempts": self.failed_attempts,
+        }
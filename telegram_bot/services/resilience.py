@@ -0,0 +1,112 @@
+# services/resilience.py
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+class CircuitOpenError(Exception):
+    """API считается недоступным: запрос не отправлялся"""
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"  # запросы идут как обычно
+    OPEN = "open"  # запросы сразу отклоняются
+    HALF_OPEN = "half_open"  # пропускается один пробный запрос
+
+class CircuitBreaker:
+    """Автоматический выключатель для вызовов API
+
+    После `failure_threshold` ошибок подряд переходит в OPEN и отклоняет
+    вызовы без обращения к сети. Через `reset_timeout` секунд пропускает
+    один пробный вызов (HALF_OPEN): успех закрывает выключатель, ошибка
+    снова открывает его на `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас"""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def abandon(self) -> None:
+        """Вызов прерван без результата: освободить место пробного запроса"""
+        self._probe_in_flight = False
+
+    def info(self) -> Dict[str, Any]:
+        return {"state": self.state.value, "failures": self.failures, "rejected": self.rejected}
+
+class RetryBudget:
+    """Бюджет повторов (token bucket)
+
+    Каждый запрос добавляет `ratio` токена, каждый повтор тратит один.
+    Так повторы составляют не больше ~ratio от числа запросов, и при сбое
+    API бот не умножает нагрузку. `min_per_second` токенов начисляется по
+    времени, чтобы при малом трафике повторы тоже были возможны.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.exhausted = 0
+        self._updated = time.monotonic()
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + amount + (now - self._updated) * self.min_per_second
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Учесть новый (не повторный) запрос"""
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        """Потратить токен на повтор; False, если бюджет исчерпан"""
+        self._refill()
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
+
+    def info(self) -> Dict[str, Any]:
+        self._refill()
+        return {"tokens": round(self.tokens, 2), "exhausted": self.exhausted}
+
+def remaining(deadline: float) -> Optional[float]:
+    """Сколько секунд осталось до дедлайна (time.monotonic); None, если истек"""
+    left = deadline - time.monotonic()
+    return left if left > 0 else None